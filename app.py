@@ -1,17 +1,36 @@
 import os
 import sys
+import abc
+import atexit
+import contextvars
 import uuid
 import sqlite3
 import time
 import json
 import shutil
+import subprocess
+import queue
+import re
+import hashlib
 import threading
 import webbrowser
+from collections import OrderedDict
+from concurrent.futures import Future
 from datetime import datetime
+from functools import wraps
+from html import escape
+from mimetypes import guess_type
 from urllib.parse import quote, urlencode
 from urllib.request import urlopen, Request
 
-from flask import Flask, render_template_string, request, redirect, session, abort
+from flask import Flask, render_template, request, redirect, session, abort, stream_with_context
+from werkzeug.security import safe_join
+from werkzeug.wsgi import wrap_file
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow yoksa küçük resim üretilmez, kartlar orijinali gösterir
+    Image = None
 
 
 # ---------------------------
@@ -35,8 +54,10 @@ BUNDLE_DIR = bundle_dir()
 STATIC_DIR = os.path.join(BASE_DIR, "static")
 VIDEOS_DIR = os.path.join(STATIC_DIR, "videolar")
 PHOTOS_DIR = os.path.join(STATIC_DIR, "fotograflar")
+THUMBS_DIR = os.path.join(STATIC_DIR, "onizleme")   # otomatik üretilen küçük resimler
 
 # TXT / DB dosyaları EXE yanında (düzenlemesi kolay)
+# duyurular.txt sadece ilk açılışta DB'ye aktarılır; sonrası panelden yönetilir
 ANNOUNCE_FILE = os.path.join(BASE_DIR, "duyurular.txt")
 CONTACT_FILE = os.path.join(BASE_DIR, "iletisim.txt")
 ADMIN_KEY_FILE = os.path.join(BASE_DIR, ".admin_key")
@@ -45,6 +66,7 @@ DB_PATH = os.path.join(BASE_DIR, "data.db")
 # Paket içinden (ilk çalıştırmada kopyalamak için) static kaynağı
 BUNDLE_STATIC = os.path.join(BUNDLE_DIR, "static")
 BUNDLE_BG = os.path.join(BUNDLE_STATIC, "arkaplan.jpg")
+BG_FILE = os.path.join(STATIC_DIR, "arkaplan.jpg")
 
 
 # ---------------------------
@@ -59,9 +81,48 @@ SOCIALS = {
     "whatsapp": "https://chat.whatsapp.com/J9tfpgXd3iu8HM1FBxC2U7",
 }
 
+PHOTO_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+VIDEO_EXTS = (".mp4", ".webm", ".mov")
+
+# Beğeni/yorum yazmaları bu pencere (ms) içinde toplanıp tek işlemde yazılır; 0 = kapalı
+WRITE_BATCH_WINDOW = float(os.environ.get("DUZAGAC_WRITE_BATCH_MS", "1")) / 1000.0
+WRITE_BATCH_MAX = 200
+WRITE_RESULT_TIMEOUT = 30.0   # sn: yazıcı thread'i ölürse/takılırsa istek sonsuza kadar beklemesin
+
+# Galeri sayfa boyutları (devamı kaydırdıkça parça parça gelir)
+PHOTO_PAGE_SIZE = 24
+VIDEO_PAGE_SIZE = 12
+
+# Küçük resim genişlikleri (px) ve WebP kalitesi
+THUMB_WIDTHS = (480, 960)
+THUMB_QUALITY = 78
+
+# Video akışı: worker başına en fazla bu kadar eşzamanlı video yanıtı.
+# Her akış gthread worker'ında bir thread'i tutar: sınır thread sayısının
+# (DUZAGAC_THREADS, gunicorn.conf.py) altında olmalı ki beğeni/yorum istekleri için
+# en az bir thread boş kalsın. Varsayılan: thread sayısı - 1. Elle verilirse aynı kural geçerli.
+# DUZAGAC_MEDIA_ACCEL=nginx  -> X-Accel-Redirect (nginx'te MEDIA_ACCEL_PREFIX internal location)
+# DUZAGAC_MEDIA_ACCEL=sendfile -> X-Sendfile (apache mod_xsendfile / lighttpd)
+MEDIA_MAX_STREAMS = int(os.environ.get(
+    "DUZAGAC_MEDIA_MAX_STREAMS", max(1, int(os.environ.get("DUZAGAC_THREADS", "4")) - 1)
+))
+MEDIA_ACCEL = os.environ.get("DUZAGAC_MEDIA_ACCEL", "").strip().lower()
+MEDIA_ACCEL_PREFIX = os.environ.get("DUZAGAC_MEDIA_ACCEL_PREFIX", "/_videolar/")
+
+# Video kapak karesi genişliği; ffmpeg/ffprobe PATH'te yoksa kapak üretilmez
+VIDEO_POSTER_WIDTH = 640
+FFMPEG = shutil.which("ffmpeg")
+FFPROBE = shutil.which("ffprobe")
+
 # Hava durumu koordinatları (ekranda görünmez)
 WEATHER_LAT = 37.579171
 WEATHER_LON = 35.820547
+# Open-Meteo adresi ortam değişkeniyle değiştirilebilir (ör. testte yerel sahte sunucu)
+WEATHER_URL = os.environ.get("DUZAGAC_WEATHER_URL", "https://api.open-meteo.com/v1/forecast")
+WEATHER_TTL = 600          # sn: bu süreden eski veri arka planda yenilenir
+WEATHER_TIMEOUT = 6
+WEATHER_RETRY_MIN = 30     # sn: hata sonrası ilk tekrar, her hatada ikiye katlanır
+WEATHER_RETRY_MAX = 1800
 
 
 # ---------------------------
@@ -70,24 +131,171 @@ WEATHER_LON = 35.820547
 app = Flask(__name__, static_folder=STATIC_DIR, static_url_path="/static")
 
 
+# ---------------------------
+# ÖLÇÜM (isteğe bağlı): DUZAGAC_METRICS=1
+# ---------------------------
+# Açıkken her istek için aşama süreleri (media, db_connect, sql, html, render, weather)
+# Server-Timing başlığına yazılır ve /metrics Prometheus metni verir (worker başına).
+# Kapalıyken hiçbir kanca/sarmalayıcı kurulmaz.
+# /metrics sadece admin'e açık. Prometheus için kaynak adresler virgülle verilebilir
+# (DUZAGAC_METRICS_ALLOW=127.0.0.1,::1); önde nginx gibi bir ters vekil varsa her istek
+# oradan (127.0.0.1) gelir, bu durumda loopback yazmak /metrics'i herkese açar.
+METRICS_ENABLED = os.environ.get("DUZAGAC_METRICS", "").strip().lower() in ("1", "true", "yes")
+METRICS_ALLOW = {a.strip() for a in os.environ.get("DUZAGAC_METRICS_ALLOW", "").split(",") if a.strip()}
+METRICS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class _RequestState:
+    # tek isteğin ölçümü; akışlı yanıtta gövde bitene kadar yaşar
+    __slots__ = ("active", "start", "stack", "phases", "queries", "connects")
+
+    def __init__(self):
+        self.active = True
+        self.start = time.perf_counter()
+        self.stack = []          # [aşama, başlangıç]
+        self.phases = {}
+        self.queries = 0
+        self.connects = 0
+
+class RequestMetrics:
+    # Aşamalar iç içe olabilir (html içinde sql): süre her zaman en içteki aşamaya yazılır.
+    # İstek durumu ContextVar'da: akışlı gövde stream_with_context ile (ASGI'de başka
+    # thread'de) üretilirken de aynı isteğe yazılır; arka plan thread'lerinde yoktur.
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self._state = contextvars.ContextVar("duzagac_request_metrics", default=None)
+        self._lock = threading.Lock()
+        self._routes = {}        # (method, route) -> [bucket sayıları..., toplam sn, adet]
+        self._phases = {}        # aşama -> toplam sn
+        self._counters = {"db_connections": 0, "sql_queries": 0}
+
+    def begin(self):
+        self._state.set(_RequestState())
+
+    def current(self):
+        st = self._state.get()
+        return st if st is not None and st.active else None
+
+    def enter(self, name):
+        st = self.current()
+        if st is None:
+            return
+        now = time.perf_counter()
+        if st.stack:
+            parent = st.stack[-1]
+            st.phases[parent[0]] = st.phases.get(parent[0], 0.0) + now - parent[1]
+        st.stack.append([name, now])
+
+    def leave(self):
+        st = self.current()
+        if st is None or not st.stack:
+            return
+        now = time.perf_counter()
+        name, started = st.stack.pop()
+        st.phases[name] = st.phases.get(name, 0.0) + now - started
+        if st.stack:
+            st.stack[-1][1] = now
+
+    def phase(self, name):
+        # fonksiyon sarmalayıcı; ölçüm kapalıysa fonksiyonun kendisi döner
+        def deco(fn):
+            if not METRICS_ENABLED:
+                return fn
+            @wraps(fn)
+            def inner(*args, **kwargs):
+                self.enter(name)
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.leave()
+            return inner
+        return deco
+
+    def count_query(self):
+        st = self.current()
+        if st is not None:
+            st.queries += 1
+        with self._lock:
+            self._counters["sql_queries"] += 1
+
+    def count_connect(self):
+        st = self.current()
+        if st is not None:
+            st.connects += 1
+        with self._lock:
+            self._counters["db_connections"] += 1
+
+    def finish(self, method, route, st=None):
+        # (toplam sn, aşamalar, sorgu, bağlantı) döner ve histogramları günceller.
+        # st: akışlı yanıtta after_request'te yakalanan durum (kapanışta bitirilir)
+        st = st or self.current()
+        if st is None or not st.active:
+            return None
+        st.active = False
+        total = time.perf_counter() - st.start
+        with self._lock:
+            h = self._routes.get((method, route))
+            if h is None:
+                h = self._routes[(method, route)] = [0] * len(self.buckets) + [0.0, 0]
+            for i, b in enumerate(self.buckets):
+                if total <= b:
+                    h[i] += 1
+            h[-2] += total
+            h[-1] += 1
+            for k, v in st.phases.items():
+                self._phases[k] = self._phases.get(k, 0.0) + v
+        return total, st.phases, st.queries, st.connects
+
+    def prometheus(self) -> str:
+        def lbl(v):
+            return str(v).replace("\\", "\\\\").replace('"', '\\"')
+        out = [
+            "# HELP duzagac_request_duration_seconds İstek süresi (route başına).",
+            "# TYPE duzagac_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            routes = {k: list(v) for k, v in self._routes.items()}
+            phases = dict(self._phases)
+            counters = dict(self._counters)
+        for (method, route), h in sorted(routes.items()):
+            base = f'method="{lbl(method)}",route="{lbl(route)}"'
+            for i, b in enumerate(self.buckets):
+                out.append(f'duzagac_request_duration_seconds_bucket{{{base},le="{b:g}"}} {h[i]}')
+            out.append(f'duzagac_request_duration_seconds_bucket{{{base},le="+Inf"}} {h[-1]}')
+            out.append(f"duzagac_request_duration_seconds_sum{{{base}}} {h[-2]:.6f}")
+            out.append(f"duzagac_request_duration_seconds_count{{{base}}} {h[-1]}")
+        out += [
+            "# HELP duzagac_phase_seconds_total İstek aşamalarında geçen toplam süre.",
+            "# TYPE duzagac_phase_seconds_total counter",
+        ]
+        for k, v in sorted(phases.items()):
+            out.append(f'duzagac_phase_seconds_total{{phase="{lbl(k)}"}} {v:.6f}')
+        out += [
+            "# HELP duzagac_db_connections_total Açılan SQLite bağlantıları.",
+            "# TYPE duzagac_db_connections_total counter",
+            f"duzagac_db_connections_total {counters['db_connections']}",
+            "# HELP duzagac_sql_queries_total Çalıştırılan SQL ifadeleri.",
+            "# TYPE duzagac_sql_queries_total counter",
+            f"duzagac_sql_queries_total {counters['sql_queries']}",
+        ]
+        return "\n".join(out) + "\n"
+
+metrics = RequestMetrics(METRICS_BUCKETS)
+
+
 def ensure_dirs_and_files():
     # static klasörleri
     os.makedirs(VIDEOS_DIR, exist_ok=True)
     os.makedirs(PHOTOS_DIR, exist_ok=True)
+    os.makedirs(THUMBS_DIR, exist_ok=True)
 
     # arkaplan.jpg yoksa bundle'dan kopyala
-    bg_target = os.path.join(STATIC_DIR, "arkaplan.jpg")
+    bg_target = BG_FILE
     if not os.path.exists(bg_target):
         # eğer bundle içinde varsa kopyala
         if os.path.exists(BUNDLE_BG):
             os.makedirs(STATIC_DIR, exist_ok=True)
             shutil.copy2(BUNDLE_BG, bg_target)
 
-    # duyurular.txt yoksa oluştur
-    if not os.path.exists(ANNOUNCE_FILE):
-        with open(ANNOUNCE_FILE, "w", encoding="utf-8") as f:
-            f.write("")  # boş
-
     # iletisim.txt yoksa oluştur
     if not os.path.exists(CONTACT_FILE):
         with open(CONTACT_FILE, "w", encoding="utf-8") as f:
@@ -101,13 +309,57 @@ def ensure_dirs_and_files():
 ensure_dirs_and_files()
 
 
+class FileCache:
+    # EXE yanındaki küçük ayar dosyaları için: içerik bellekte tutulur, dosya en fazla
+    # CHECK_INTERVAL'da bir stat edilir ve sadece mtime/inode/boyut değişince yeniden
+    # okunur. "txt'yi düzenle, kaydet" akışı aynen çalışır (en geç ~1 sn'de görünür).
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self, path: str, loader, default=None):
+        self.path = path
+        self.loader = loader      # loader(path) -> değer
+        self.default = default    # dosya yoksa/okunamazsa
+        self.signature = None
+        self._lock = threading.Lock()
+        self._value = default
+        self._checked = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if now - self._checked < self.CHECK_INTERVAL:
+            return self._value
+        with self._lock:
+            if now - self._checked >= self.CHECK_INTERVAL:
+                self._refresh()
+                self._checked = time.monotonic()
+            return self._value
+
+    def _refresh(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.signature = None
+            self._value = self.default
+            return
+        sig = (st.st_mtime_ns, st.st_ino, st.st_size)
+        if sig == self.signature:
+            return
+        try:
+            self._value = self.loader(self.path)
+        except Exception:
+            self._value = self.default
+        self.signature = sig
+
+
+def _load_admin_key(path: str) -> str | None:
+    with open(path, "r", encoding="utf-8") as f:
+        key = f.read().strip()
+        return key if key else None
+
+admin_key_file = FileCache(ADMIN_KEY_FILE, _load_admin_key)
+
 def read_admin_key() -> str | None:
-    try:
-        with open(ADMIN_KEY_FILE, "r", encoding="utf-8") as f:
-            key = f.read().strip()
-            return key if key else None
-    except Exception:
-        return None
+    return admin_key_file.get()
 
 _admin_key = read_admin_key()
 app.secret_key = ("duzagac_koyu_secret_" + (_admin_key or "no_admin_key")).encode("utf-8")
@@ -116,14 +368,113 @@ app.secret_key = ("duzagac_koyu_secret_" + (_admin_key or "no_admin_key")).encod
 # ---------------------------
 # DB
 # ---------------------------
-def db():
-    con = sqlite3.connect(DB_PATH)
+DB_BUSY_TIMEOUT = 5.0          # sn: kilitli DB için SQLite'ın kendi bekleme süresi
+DB_BUSY_RETRIES = 4            # busy_timeout'a rağmen "database is locked" olursa tekrar
+DB_MMAP_SIZE = 64 * 1024 * 1024
+
+class PooledConnection(sqlite3.Connection):
+    # Thread başına tek bağlantı: close() bağlantıyı kapatmaz, sadece yarım kalan
+    # işlemi geri alır. Böylece mevcut "con = db() ... con.close()" kalıbı aynen çalışır.
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def really_close(self):
+        super().close()
+
+class _TimedCursor(sqlite3.Cursor):
+    # sadece ölçüm açıkken: execute/fetch süreleri "sql" aşamasına yazılır
+    def execute(self, *args):
+        metrics.count_query()
+        metrics.enter("sql")
+        try:
+            return super().execute(*args)
+        finally:
+            metrics.leave()
+
+    def executemany(self, *args):
+        metrics.count_query()
+        metrics.enter("sql")
+        try:
+            return super().executemany(*args)
+        finally:
+            metrics.leave()
+
+    def fetchall(self):
+        metrics.enter("sql")
+        try:
+            return super().fetchall()
+        finally:
+            metrics.leave()
+
+class InstrumentedConnection(PooledConnection):
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+_db_local = threading.local()
+
+@metrics.phase("db_connect")
+def _connect():
+    if METRICS_ENABLED:
+        metrics.count_connect()
+    factory = InstrumentedConnection if METRICS_ENABLED else PooledConnection
+    con = sqlite3.connect(DB_PATH, timeout=DB_BUSY_TIMEOUT, factory=factory)
     con.row_factory = sqlite3.Row
+    con.execute("PRAGMA synchronous=NORMAL")   # WAL ile güvenli, her commit'te fsync yok
+    con.execute(f"PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT * 1000)}")
+    con.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    con.execute("PRAGMA temp_store=MEMORY")
     return con
 
+def db():
+    # gunicorn fork sonrası ebeveynden kalan bağlantı kullanılmaz (pid kontrolü)
+    con = getattr(_db_local, "con", None)
+    if con is None or _db_local.pid != os.getpid():
+        con = _connect()
+        _db_local.con = con
+        _db_local.pid = os.getpid()
+    return con
+
+def release_db():
+    # istek sonunda: bağlantı thread'de kalır, açık işlem varsa geri alınır
+    con = getattr(_db_local, "con", None)
+    if con is not None and _db_local.pid == os.getpid() and con.in_transaction:
+        con.rollback()
+
+def close_db():
+    # bu thread'in bağlantısını gerçekten kapat (gunicorn preload: fork öncesi
+    # ebeveynde açık SQLite bağlantısı bırakılmaz)
+    con = getattr(_db_local, "con", None)
+    if con is not None and _db_local.pid == os.getpid():
+        con.really_close()
+    _db_local.con = None
+
+def with_busy_retry(fn):
+    # yazma yardımcıları için: kilit hatasında kısa bekleyip yeniden dene
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(DB_BUSY_RETRIES + 1):
+            try:
+                return fn(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                msg = str(e).lower()
+                if attempt >= DB_BUSY_RETRIES or ("locked" not in msg and "busy" not in msg):
+                    raise
+                release_db()
+                time.sleep(0.05 * (2 ** attempt))
+    return wrapper
+
 def init_db():
     con = db()
     cur = con.cursor()
+    # WAL kalıcıdır (DB dosyasına yazılır): okuyucular yazarları bloklamaz
+    cur.execute("PRAGMA journal_mode=WAL")
     cur.execute("""
         CREATE TABLE IF NOT EXISTS likes (
             post_id TEXT NOT NULL,
@@ -144,7 +495,202 @@ def init_db():
         )
     """)
     con.commit()
-    con.close()
+    migrate_db(con)
+    close_db()
+
+
+# ---------------------------
+# DB şema sürümleri (PRAGMA user_version)
+# ---------------------------
+# Her adım bir kere, sırayla ve veri silmeden uygulanır. Yeni şema değişikliği
+# = listenin SONUNA yeni fonksiyon. Var olan adımlar sonradan değiştirilmez.
+def _m001_comment_indexes(cur):
+    # comments_for / feed_state: post_id filtresi + en yeni üstte (id DESC)
+    # likes için ek index gerekmez: PRIMARY KEY (post_id, device_id) zaten kapsar
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_comments_post_id ON comments (post_id, id DESC)")
+
+def _m002_post_stats(cur):
+    # Post başına sayaçlar: beğeni/yorum yazılırken trigger'larla aynı işlemde güncellenir,
+    # okurken COUNT(*) yerine tek satır okunur.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS post_stats (
+            post_id TEXT PRIMARY KEY,
+            like_count INTEGER NOT NULL DEFAULT 0,
+            comment_count INTEGER NOT NULL DEFAULT 0,
+            last_activity TEXT
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_post_stats_likes ON post_stats (like_count DESC)")
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_likes_ins AFTER INSERT ON likes BEGIN
+            INSERT INTO post_stats (post_id, like_count, comment_count, last_activity)
+            VALUES (NEW.post_id, 1, 0, NEW.created_at)
+            ON CONFLICT(post_id) DO UPDATE SET like_count = like_count + 1, last_activity = excluded.last_activity;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_likes_del AFTER DELETE ON likes BEGIN
+            UPDATE post_stats SET like_count = MAX(like_count - 1, 0) WHERE post_id = OLD.post_id;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_comments_ins AFTER INSERT ON comments BEGIN
+            INSERT INTO post_stats (post_id, like_count, comment_count, last_activity)
+            VALUES (NEW.post_id, 0, 1, NEW.created_at)
+            ON CONFLICT(post_id) DO UPDATE SET comment_count = comment_count + 1, last_activity = excluded.last_activity;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_comments_del AFTER DELETE ON comments BEGIN
+            UPDATE post_stats SET comment_count = MAX(comment_count - 1, 0) WHERE post_id = OLD.post_id;
+        END
+    """)
+    # mevcut verilerden doldur
+    cur.execute("""
+        INSERT OR REPLACE INTO post_stats (post_id, like_count, comment_count, last_activity)
+        SELECT post_id, SUM(lc), SUM(cc), MAX(ts) FROM (
+            SELECT post_id, COUNT(*) AS lc, 0 AS cc, MAX(created_at) AS ts FROM likes GROUP BY post_id
+            UNION ALL
+            SELECT post_id, 0, COUNT(*), MAX(created_at) FROM comments GROUP BY post_id
+        ) GROUP BY post_id
+    """)
+
+def _m003_change_counters(cur):
+    # Kapsam başına ("foto", "video", ...) değişiklik sayacı: sayfa önbelleği ve
+    # ETag'ler bununla geçerliliğini kontrol eder (tüm worker'lar aynı DB'yi görür).
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS change_counters (
+            scope TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for table, when, row in (
+        ("likes", "INSERT", "NEW"), ("likes", "DELETE", "OLD"),
+        ("comments", "INSERT", "NEW"), ("comments", "DELETE", "OLD"),
+    ):
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_{when.lower()}_version AFTER {when} ON {table} BEGIN
+                INSERT INTO change_counters (scope, version)
+                VALUES (substr({row}.post_id, 1, instr({row}.post_id, ':') - 1), 1)
+                ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+            END
+        """)
+
+def _m004_announcements(cur):
+    # Duyurular: kalıcı id + zaman damgası; eski duyurular.txt bir kere içeri alınır
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS announcements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+    for when, row in (("INSERT", "NEW"), ("DELETE", "OLD")):
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_announcements_{when.lower()}_version AFTER {when} ON announcements BEGIN
+                INSERT INTO change_counters (scope, version) VALUES ('duyuru', 1)
+                ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+            END
+        """)
+    if os.path.exists(ANNOUNCE_FILE):
+        with open(ANNOUNCE_FILE, "r", encoding="utf-8") as f:
+            lines = [t.strip() for t in f.read().splitlines() if t.strip()]
+        # dosyada tek tarih var: hepsine dosyanın tarihi (sıra id ile korunur)
+        created = datetime.fromtimestamp(os.path.getmtime(ANNOUNCE_FILE)).isoformat(timespec="seconds")
+        cur.executemany(
+            "INSERT INTO announcements (text, created_at) VALUES (?, ?)",
+            [(t, created) for t in lines]
+        )
+
+def _m005_moderation_indexes(cur):
+    # panel filtreleri: tarih aralığı ve ada göre (önek, büyük/küçük harf duyarsız)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_comments_created ON comments (created_at)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_comments_name ON comments (name_full COLLATE NOCASE)")
+
+def _tr_fold_sql(expr: str) -> str:
+    # Türkçe büyük harfler: I -> ı, İ -> i (kalanını FTS tokenizer'ı küçültür)
+    return f"replace(replace({expr}, 'I', 'ı'), 'İ', 'i')"
+
+def _m006_search_index(cur):
+    # Yorum + duyuru tam metin araması. rowid: yorum = id*2, duyuru = id*2+1.
+    # Metin katlanmış haliyle saklanır; sonuçlar asıl tablodan okunur.
+    cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            body, name, tokenize = "unicode61 remove_diacritics 0"
+        )
+    """)
+    cur.execute("INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(1.0, 0.5)')")
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_comments_ins_search AFTER INSERT ON comments BEGIN
+            INSERT INTO search_index (rowid, body, name)
+            VALUES (NEW.id * 2, {_tr_fold_sql("NEW.comment")}, {_tr_fold_sql("NEW.name_full")});
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_comments_del_search AFTER DELETE ON comments BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 2;
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_announcements_ins_search AFTER INSERT ON announcements BEGIN
+            INSERT INTO search_index (rowid, body, name)
+            VALUES (NEW.id * 2 + 1, {_tr_fold_sql("NEW.text")}, '');
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_announcements_del_search AFTER DELETE ON announcements BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 2 + 1;
+        END
+    """)
+    cur.execute(f"""
+        INSERT INTO search_index (rowid, body, name)
+        SELECT id * 2, {_tr_fold_sql("comment")}, {_tr_fold_sql("name_full")} FROM comments
+    """)
+    cur.execute(f"""
+        INSERT INTO search_index (rowid, body, name)
+        SELECT id * 2 + 1, {_tr_fold_sql("text")}, '' FROM announcements
+    """)
+
+def _name_fold_sql(expr: str) -> str:
+    # Panel ad filtresi için katlama. SQLite lower() sadece ASCII'yi küçültür: Türkçe
+    # büyük harfler (I/İ dahil) elle çevrilir. Sorgu ve index aynı ifadeyi kullanır.
+    out = _tr_fold_sql(expr)
+    for upper, lower in (("Ç", "ç"), ("Ğ", "ğ"), ("Ö", "ö"), ("Ş", "ş"), ("Ü", "ü")):
+        out = f"replace({out}, '{upper}', '{lower}')"
+    return f"lower({out})"
+
+def _m007_name_fold_index(cur):
+    # ada göre önek filtresi Türkçe harflerde de büyük/küçük harf duyarsız olsun
+    # (NOCASE sadece ASCII'yi katlar: "is" -> "İsmail" bulunmuyordu)
+    cur.execute(f"CREATE INDEX IF NOT EXISTS idx_comments_name_fold ON comments ({_name_fold_sql('name_full')})")
+    cur.execute("DROP INDEX IF EXISTS idx_comments_name")
+
+MIGRATIONS = [
+    _m001_comment_indexes,
+    _m002_post_stats,
+    _m003_change_counters,
+    _m004_announcements,
+    _m005_moderation_indexes,
+    _m006_search_index,
+    _m007_name_fold_index,
+]
+
+def migrate_db(con):
+    cur = con.cursor()
+    for target, step in enumerate(MIGRATIONS, start=1):
+        # IMMEDIATE: aynı anda açılan birden çok worker aynı adımı iki kez uygulamasın
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            version = cur.execute("PRAGMA user_version").fetchone()[0]
+            if version >= target:
+                con.rollback()
+                continue
+            step(cur)
+            cur.execute(f"PRAGMA user_version={target}")
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
 
 init_db()
 
@@ -161,17 +707,416 @@ def get_device_id():
 def safe_filename(name: str) -> str:
     return os.path.basename(name)
 
+class MediaIndex:
+    # Bir klasördeki medya listesinin bellekteki kopyası.
+    # Klasöre dosya eklenince/silinince klasörün mtime'ı değişir: her çağrıda sadece
+    # klasörün kendisi stat edilir, dosyalar klasör değiştiyse ya da RESCAN_SECONDS
+    # geçtiyse yeniden stat edilir. Yerinde üzerine yazılan dosya klasörün mtime'ını
+    # değiştirmez; periyodik tarama onu (ve yeni türevlerini) en geç bu sürede yakalar.
+    SETTLE_SECONDS = 2.0  # mtime çözünürlüğü kaba olan dosya sistemleri için
+    RESCAN_SECONDS = 30.0
+
+    def __init__(self, folder: str, exts: tuple[str, ...]):
+        self.folder = folder
+        self.exts = exts
+        # dosya adı + mtime özeti: aynı klasörü gören her worker süreci aynı değeri bulur (ETag için)
+        self.signature = ""
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._scanned = 0.0   # son taramanın time.monotonic() zamanı
+        self._stat = {}     # filename -> (ts, mtime_ns)
+        self._items = []
+        self._by_name = {}
+
+    @metrics.phase("media")
+    def items(self):
+        # Dönen liste paylaşılır: çağıran değiştirmemeli
+        try:
+            mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime == self._mtime and not self._rescan_due():
+            return self._items
+        with self._lock:
+            if mtime is None or mtime != self._mtime or self._rescan_due():
+                self._rebuild(mtime)
+            return self._items
+
+    def _rescan_due(self) -> bool:
+        return time.monotonic() - self._scanned >= self.RESCAN_SECONDS
+
+    def get(self, filename: str):
+        self.items()
+        return self._by_name.get(filename)
+
+    @metrics.phase("media")
+    def page(self, after: tuple[float, str] | None, limit: int):
+        # Keyset sayfalama: (ts, filename) sırasında 'after'dan hemen sonraki 'limit' kayıt.
+        # Arada dosya eklense/silinse de sayfalar kaymaz.
+        items = self.items()
+        lo = 0
+        if after is not None:
+            hi = len(items)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if (items[mid]["ts"], items[mid]["filename"]) < after:
+                    hi = mid
+                else:
+                    lo = mid + 1
+        chunk = items[lo:lo + limit]
+        has_more = lo + limit < len(items)
+        return chunk, (media_cursor(chunk[-1]) if chunk and has_more else None)
+
+    def cursor_for(self, filename: str):
+        # 'filename' ilk kart olacak şekilde sayfanın cursor'ı: (dosya var mı, cursor)
+        items = self.items()
+        item = self._by_name.get(filename)
+        if item is None:
+            return False, None
+        key = (item["ts"], item["filename"])
+        lo, hi = 0, len(items)
+        while lo < hi:   # liste (ts, filename) sırasında azalan
+            mid = (lo + hi) // 2
+            if (items[mid]["ts"], items[mid]["filename"]) > key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return True, (media_cursor(items[lo - 1]) if lo else None)
+
+    def _rebuild(self, mtime):
+        stat_map = {}
+        if mtime is not None:
+            with os.scandir(self.folder) as it:
+                for e in it:
+                    if not e.name.lower().endswith(self.exts):
+                        continue
+                    try:
+                        if not e.is_file():
+                            continue
+                        est = e.stat()
+                    except OSError:
+                        continue
+                    # ts: Windows'ta kopyalama/oluşturma zamanı, bilinen dosyada sabit kalır
+                    # (sayfa cursor'ları kaymasın); mtime: türev dosya anahtarı, her taramada taze
+                    known = self._stat.get(e.name)
+                    stat_map[e.name] = (known[0] if known else est.st_ctime, est.st_mtime_ns)
+
+        items = [{"filename": fn, "ts": ts, "mtime": mt} for fn, (ts, mt) in stat_map.items()]
+        items.sort(key=lambda x: (x["ts"], x["filename"]), reverse=True)  # en yeni üste
+        if stat_map != self._stat:
+            self.signature = hashlib.sha1(
+                repr(sorted((fn, mt) for fn, (_, mt) in stat_map.items())).encode("utf-8")
+            ).hexdigest()[:16]
+        self._stat = stat_map
+        self._items = items
+        self._by_name = {x["filename"]: x for x in items}
+        # klasör az önce değiştiyse aynı mtime içinde yeni dosya gelebilir: sonraki çağrıda tekrar bak
+        recent = mtime is not None and (time.time_ns() - mtime) < self.SETTLE_SECONDS * 1e9
+        self._mtime = None if recent else mtime
+        self._scanned = time.monotonic()
+
+_media_indexes = {}
+_media_indexes_lock = threading.Lock()
+
+def media_index(folder: str, exts: tuple[str, ...]) -> MediaIndex:
+    key = (folder, exts)
+    idx = _media_indexes.get(key)
+    if idx is None:
+        with _media_indexes_lock:
+            idx = _media_indexes.setdefault(key, MediaIndex(folder, exts))
+    return idx
+
+def media_cursor(item) -> str:
+    # repr(float) geri okununca aynı sayıyı verir
+    return f"{item['ts']!r}|{item['filename']}"
+
+def parse_media_cursor(raw: str | None) -> tuple[float, str] | None:
+    if not raw:
+        return None
+    ts, sep, fn = raw.partition("|")
+    if not sep:
+        raise ValueError("bad cursor")
+    return float(ts), fn
+
 def list_media(folder: str, exts: tuple[str, ...]):
-    # Windows'ta kopyalama/oluşturma zamanı (en yeni üste)
-    items = []
-    if not os.path.isdir(folder):
-        return items
-    for fn in os.listdir(folder):
-        p = os.path.join(folder, fn)
-        if os.path.isfile(p) and fn.lower().endswith(exts):
-            items.append({"filename": fn, "ts": os.path.getctime(p)})
-    items.sort(key=lambda x: x["ts"], reverse=True)
-    return items
+    # en yeni üste; MediaIndex sayesinde klasör değişmedikçe (RESCAN_SECONDS içinde) dosya stat'ı yok
+    return media_index(folder, exts).items()
+
+# ---------------------------
+# Türev dosyalar: foto küçük resimleri + video kapakları (arka planda üretilir)
+# ---------------------------
+def _derivative_prefix(filename: str) -> str:
+    return hashlib.sha1(filename.encode("utf-8")).hexdigest()[:16]
+
+def thumb_name(filename: str, mtime_ns: int, width: int) -> str:
+    # kaynak adı + mtime: foto değişirse yeni türev üretilir
+    return f"{_derivative_prefix(filename)}_{mtime_ns}_{width}.webp"
+
+def remove_derivatives(filename: str):
+    # foto/video silinince türevlerini de sil
+    prefix = _derivative_prefix(filename) + "_"
+    try:
+        names = os.listdir(THUMBS_DIR)
+    except OSError:
+        return
+    for name in names:
+        if name.startswith(prefix):
+            try:
+                os.remove(os.path.join(THUMBS_DIR, name))
+            except OSError:
+                pass
+
+class BackgroundWorker(abc.ABC):
+    # Tek thread'li iş kuyruğu. İstek sırasında ağır iş yapılmaz: eksik türev
+    # kuyruğa atılır, hazır olunca sonraki gösterimde kullanılır.
+    thread_name = "worker"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self._queue = None
+        self._pending = set()
+        self._failed = set()
+
+    def submit(self, key):
+        self._ensure_thread()
+        with self._lock:
+            if key in self._pending or key in self._failed:
+                return
+            self._pending.add(key)
+        self._queue.put(key)
+
+    def _ensure_thread(self):
+        # gunicorn fork sonrası thread'ler çocuğa geçmez: pid değiştiyse yeniden başlat
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._queue = queue.Queue()
+            self._pending = set()
+            self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        q = self._queue
+        while True:
+            key = q.get()
+            try:
+                self._make(key)
+            except Exception:
+                # bozuk/okunamayan dosya: orijinal gösterilmeye devam eder, tekrar denenmez
+                with self._lock:
+                    self._failed.add(key)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+    @abc.abstractmethod
+    def _make(self, key):
+        # key için türevi üret; istisna atarsa key bu süreçte tekrar denenmez
+        ...
+
+
+class ThumbnailWorker(BackgroundWorker):
+    thread_name = "thumbnails"
+
+    def __init__(self):
+        super().__init__()
+        self._ready = set()
+
+    def urls(self, filename: str, mtime_ns: int) -> dict[int, str]:
+        # {genişlik: url}; türevler hazır değilse boş
+        if Image is None:
+            return {}
+        out = {}
+        for w in THUMB_WIDTHS:
+            name = thumb_name(filename, mtime_ns, w)
+            if name not in self._ready:
+                if not os.path.exists(os.path.join(THUMBS_DIR, name)):
+                    self.submit((filename, mtime_ns))
+                    return {}
+                self._ready.add(name)
+            out[w] = f"/static/onizleme/{name}"
+        return out
+
+    def remove(self, filename: str):
+        prefix = _derivative_prefix(filename) + "_"
+        self._ready = {n for n in self._ready if not n.startswith(prefix)}
+        remove_derivatives(filename)
+
+    def _make(self, key):
+        filename, mtime_ns = key
+        src = os.path.join(PHOTOS_DIR, filename)
+        with Image.open(src) as im:
+            # JPEG'i doğrudan küçültülmüş çöz (büyük kamera fotoğraflarında hızlı)
+            im.draft("RGB", (max(THUMB_WIDTHS), max(THUMB_WIDTHS)))
+            im = ImageOps.exif_transpose(im)
+            if im.mode not in ("RGB", "RGBA"):
+                im = im.convert("RGB")
+            for w in sorted(THUMB_WIDTHS, reverse=True):
+                name = thumb_name(filename, mtime_ns, w)
+                dst = os.path.join(THUMBS_DIR, name)
+                if os.path.exists(dst):  # başka worker süreci üretmiş
+                    self._ready.add(name)
+                    continue
+                im.thumbnail((w, w * 4))
+                tmp = dst + ".tmp"
+                im.save(tmp, "WEBP", quality=THUMB_QUALITY, method=4)
+                os.replace(tmp, dst)
+                self._ready.add(name)
+
+
+class VideoPreviewWorker(BackgroundWorker):
+    # Her video için bir kere: ffprobe ile süre, ffmpeg ile kapak karesi.
+    # Sonuç onizleme/ klasöründe <ad>_<mtime>.json olarak saklanır (json en son
+    # yazılır = iş bitti işareti). ffmpeg yoksa kapaksız oynat düğmesi gösterilir.
+    # mtime her seferinde dosyadan taze okunur (MediaIndex'teki değer eski olabilir).
+    # Kopyalanmakta olan (mtime'ı yeni/değişen) video işlenmez; süre ya da kapak
+    # çıkarılamazsa json yazılmaz: yarım sonuç diskte kalıcı olmaz.
+    thread_name = "video-previews"
+    SETTLE_SECONDS = 10.0   # son değişiklikten bu kadar sonra "kopyalama bitti" sayılır
+
+    def __init__(self):
+        super().__init__()
+        self._meta = {}
+
+    def preview(self, filename: str) -> dict | None:
+        # {"poster": url, "duration": sn}; henüz hazır değilse None
+        if not (FFMPEG and FFPROBE):
+            return None
+        try:
+            mtime_ns = os.stat(os.path.join(VIDEOS_DIR, filename)).st_mtime_ns
+        except OSError:
+            return None
+        key = (filename, mtime_ns)
+        meta = self._meta.get(key)
+        if meta is not None:
+            return meta
+        base = f"{_derivative_prefix(filename)}_{mtime_ns}"
+        try:
+            with open(os.path.join(THUMBS_DIR, base + ".json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self.submit(key)
+            return None
+        self._meta[key] = meta
+        return meta
+
+    def remove(self, filename: str):
+        self._meta = {k: v for k, v in self._meta.items() if k[0] != filename}
+        remove_derivatives(filename)
+
+    def _unchanged(self, src: str, mtime_ns: int) -> bool:
+        try:
+            st = os.stat(src)
+        except OSError:
+            return False
+        return st.st_mtime_ns == mtime_ns and time.time_ns() - mtime_ns >= self.SETTLE_SECONDS * 1e9
+
+    def _make(self, key):
+        filename, mtime_ns = key
+        src = os.path.join(VIDEOS_DIR, filename)
+        if not self._unchanged(src, mtime_ns):
+            return   # hâlâ yazılıyor: sonraki gösterimde tekrar kuyruğa girer
+        base = f"{_derivative_prefix(filename)}_{mtime_ns}"
+        # Windows EXE'de her ffmpeg çağrısında konsol penceresi açılmasın
+        flags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+        duration = None
+        r = subprocess.run(
+            [FFPROBE, "-v", "error", "-show_entries", "format=duration", "-of", "default=nw=1:nk=1", src],
+            capture_output=True, text=True, timeout=60, creationflags=flags,
+        )
+        try:
+            duration = float(r.stdout.strip())
+        except ValueError:
+            pass
+
+        poster = None
+        dst = os.path.join(THUMBS_DIR, base + "_poster.jpg")
+        tmp = os.path.join(THUMBS_DIR, base + "_poster.tmp.jpg")
+        seek = min(1.0, duration / 2) if duration else 0.0
+        r = subprocess.run(
+            [FFMPEG, "-v", "error", "-y", "-ss", f"{seek:.2f}", "-i", src,
+             "-frames:v", "1", "-vf", f"scale='min({VIDEO_POSTER_WIDTH},iw)':-2", "-q:v", "4", tmp],
+            capture_output=True, timeout=120, creationflags=flags,
+        )
+        if r.returncode == 0 and os.path.exists(tmp):
+            os.replace(tmp, dst)
+            poster = f"/static/onizleme/{base}_poster.jpg"
+
+        if poster is None or duration is None or not self._unchanged(src, mtime_ns):
+            # bozuk ya da işlem sırasında değişmiş dosya: sonuç saklanmaz
+            for path in (dst, tmp):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            raise RuntimeError(f"video önizlemesi çıkarılamadı: {filename}")
+
+        meta = {"poster": poster, "duration": duration}
+        tmp = os.path.join(THUMBS_DIR, base + ".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(THUMBS_DIR, base + ".json"))
+        self._meta[key] = meta
+
+
+thumbnails = ThumbnailWorker()
+video_previews = VideoPreviewWorker()
+
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+def versioned_url(url: str, token) -> str:
+    # ?v=<dosya sürümü>: dosya değişince URL de değişir, tarayıcı bir yıl önbellekte tutabilir
+    return f"{url}?v={token:x}" if token else url
+
+def version_is_current(v: str | None, st) -> bool:
+    # ?v= sayfa üretilirkenki mtime'dan gelir (MediaIndex en fazla RESCAN_SECONDS eski).
+    # Yanıt sadece v dosyanın ŞU ANKİ mtime'ı ise immutable olur; yerinde değişmiş dosya
+    # eski adresle bir yıl önbellekte takılı kalmasın.
+    return bool(v) and st is not None and v == f"{st.st_mtime_ns:x}"
+
+def photo_media_html(item) -> str:
+    # Küçük resim hazırsa srcset + lazy; orijinal sadece tıklayınca iner
+    fn = safe_filename(item["filename"])
+    url = versioned_url(f"/static/fotograflar/{quote(fn)}", item.get("mtime"))
+    thumbs = thumbnails.urls(fn, item.get("mtime", 0))
+    if not thumbs:
+        return f"<img src='{url}' alt='{fn}' loading='lazy' decoding='async'>"
+    srcset = ", ".join(f"{u} {w}w" for w, u in sorted(thumbs.items()))
+    return (
+        f"<a href='{url}' target='_blank' rel='noopener'>"
+        f"<img src='{thumbs[min(thumbs)]}' srcset='{srcset}' sizes='(max-width: 760px) 100vw, 760px' "
+        f"alt='{fn}' loading='lazy' decoding='async'></a>"
+    )
+
+def fmt_duration(seconds) -> str:
+    if not seconds:
+        return ""
+    total = int(round(seconds))
+    h, rest = divmod(total, 3600)
+    m, sec = divmod(rest, 60)
+    return f"{h}:{m:02d}:{sec:02d}" if h else f"{m}:{sec:02d}"
+
+def video_media_html(item) -> str:
+    # Sayfa açılırken video isteği yok: kapak + süre gösterilir, <video> tıklayınca eklenir
+    fn = safe_filename(item["filename"])
+    url = versioned_url(f"/medya/video/{quote(fn)}", item.get("mtime"))
+    meta = video_previews.preview(fn) or {}
+    poster = meta.get("poster")
+    dur = fmt_duration(meta.get("duration"))
+    img = f"<img src='{poster}' alt='{fn}' loading='lazy' decoding='async'>" if poster else ""
+    return f"""
+      <a class="videoPoster" href="{url}" data-src="{url}" data-poster="{poster or ''}" onclick="return playVideo(this)">
+        {img}
+        <span class="playBtn">▶</span>
+        {f'<span class="vDur">{dur}</span>' if dur else ''}
+      </a>
+    """
 
 def fmt_date_ddmmyy(iso_str: str) -> str:
     try:
@@ -184,64 +1129,253 @@ def first_name(full: str) -> str:
     full = (full or "").strip()
     return full.split()[0] if full else ""
 
-def like_count(post_id: str) -> int:
+def post_counts(post_id: str) -> tuple[int, int]:
+    # (beğeni, yorum) — post_stats'tan tek satır
     con = db()
-    cur = con.cursor()
-    cur.execute("SELECT COUNT(*) AS c FROM likes WHERE post_id=?", (post_id,))
-    row = cur.fetchone()
+    row = con.execute("SELECT like_count, comment_count FROM post_stats WHERE post_id=?", (post_id,)).fetchone()
     con.close()
-    return int(row["c"] if row else 0)
+    return (int(row["like_count"]), int(row["comment_count"])) if row else (0, 0)
 
-def has_liked(post_id: str, device_id: str) -> bool:
+# ---------------------------
+# Yazma kuyruğu (beğeni/yorum): birkaç ms içinde gelenler tek işlemde yazılır
+# ---------------------------
+class WriteQueue:
+    # Group commit: her tıklama ayrı commit/fsync yerine, pencere süresi içinde gelen
+    # yazmalar tek BEGIN IMMEDIATE ... COMMIT içinde uygulanır. Çağıran sonucu bekler
+    # (beğeni eklendi mi / yeni yorum id), yani davranış eskisiyle aynıdır.
+    # window <= 0 ise kuyruk kullanılmaz, her yazma doğrudan yapılır.
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._closed = False
+
+    def submit(self, op: str, args: tuple):
+        if self.window <= 0 or self._closed:
+            return self._apply_now(op, args)
+        fut = Future()
+        self._ensure_thread()
+        # kontrol ve put aynı kilit altında: close()'un None'ından sonra kuyruğa
+        # giren (hiç işlenmeyecek) yazma olmaz
+        with self._lock:
+            queued = not self._closed
+            if queued:
+                self._queue.put((op, args, fut))
+        if not queued:
+            return self._apply_now(op, args)
+        return fut.result(timeout=WRITE_RESULT_TIMEOUT)
+
+    def close(self, timeout: float = 5.0):
+        # kapanışta kuyrukta kalanları yaz
+        with self._lock:
+            self._closed = True
+            thread = self._thread if self._pid == os.getpid() else None
+            if thread is not None:
+                self._queue.put(None)
+        if thread is not None:
+            thread.join(timeout)
+
+    def _apply_now(self, op, args):
+        ok, value = _commit_writes([(op, args)])[0]
+        if not ok:
+            raise value
+        return value
+
+    def _ensure_thread(self):
+        # gunicorn fork sonrası thread çocuğa geçmez: pid değiştiyse yeniden başlat
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        q = self._queue
+        stop = False
+        while not stop:
+            item = q.get()
+            if item is None:
+                break
+            # önce zaten bekleyenleri al; yük varken önceki commit sürerken biriken
+            # yazmalar böylece gecikme eklemeden aynı işleme girer
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = q.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                results = _commit_writes([(op, args) for op, args, _ in batch])
+            except Exception as e:
+                for _, _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            for (_, _, fut), (ok, value) in zip(batch, results):
+                if ok:
+                    fut.set_result(value)
+                else:
+                    fut.set_exception(value)
+
+@with_busy_retry
+def _commit_writes(ops):
+    # [(op, args)] -> [(başarılı mı, sonuç/hata)]; hepsi tek işlemde
     con = db()
     cur = con.cursor()
-    cur.execute("SELECT 1 FROM likes WHERE post_id=? AND device_id=? LIMIT 1", (post_id, device_id))
-    row = cur.fetchone()
-    con.close()
-    return row is not None
+    results = []
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        for op, args in ops:
+            try:
+                if op == "like":
+                    # PRIMARY KEY (post_id, device_id): aynı cihaz ikinci kez beğenemez
+                    cur.execute(
+                        "INSERT OR IGNORE INTO likes (post_id, device_id, name_full, created_at) VALUES (?,?,?,?)",
+                        args
+                    )
+                    results.append((True, cur.rowcount == 1))
+                elif op == "comment":
+                    cur.execute(
+                        "INSERT INTO comments (post_id, device_id, name_full, comment, created_at) VALUES (?,?,?,?,?)",
+                        args
+                    )
+                    results.append((True, cur.lastrowid))
+                else:
+                    results.append((False, ValueError(f"unknown write op: {op}")))
+            except sqlite3.IntegrityError as e:
+                results.append((False, e))
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    return results
+
+write_queue = WriteQueue(WRITE_BATCH_WINDOW, WRITE_BATCH_MAX)
+atexit.register(write_queue.close)
 
 def add_like(post_id: str, device_id: str, name_full: str) -> bool:
+    added = write_queue.submit(
+        "like", (post_id, device_id, name_full, datetime.now().isoformat(timespec="seconds"))
+    )
+    if added:
+        response_cache.invalidate(post_id.partition(":")[0])
+    return added
+
+COMMENT_PAGE_SIZE = 20
+
+def comments_for(post_id: str, before_id: int | None = None, limit: int = COMMENT_PAGE_SIZE):
+    # bir postun yorumları, en yeni üstte; id'ye göre keyset (idx_comments_post_id)
     con = db()
     cur = con.cursor()
-    try:
+    if before_id is None:
         cur.execute(
-            "INSERT INTO likes (post_id, device_id, name_full, created_at) VALUES (?,?,?,?)",
-            (post_id, device_id, name_full, datetime.now().isoformat(timespec="seconds"))
+            "SELECT id, name_full, comment, created_at FROM comments WHERE post_id=? ORDER BY id DESC LIMIT ?",
+            (post_id, limit + 1)
         )
-        con.commit()
-        con.close()
-        return True
-    except sqlite3.IntegrityError:
+    else:
+        cur.execute(
+            "SELECT id, name_full, comment, created_at FROM comments WHERE post_id=? AND id < ? ORDER BY id DESC LIMIT ?",
+            (post_id, before_id, limit + 1)
+        )
+    rows = cur.fetchall()
+    con.close()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, (rows[-1]["id"] if more and rows else None)
+
+def liked_posts(post_ids: list[str], device_id: str, cur=None) -> list[str]:
+    # verilen postlardan bu cihazın beğendikleri
+    own = cur is None
+    if own:
+        con = db()
+        cur = con.cursor()
+    out = []
+    for i in range(0, len(post_ids), SQL_IN_CHUNK):
+        chunk = post_ids[i:i + SQL_IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        cur.execute(f"SELECT post_id FROM likes WHERE device_id=? AND post_id IN ({marks})", [device_id, *chunk])
+        out.extend(r["post_id"] for r in cur.fetchall())
+    if own:
         con.close()
-        return False
+    return out
+
+FEED_COMMENT_LIMIT = 3     # kartta görünen en yeni yorum sayısı; devamı /yorumlar'dan
+SQL_IN_CHUNK = 500  # eski SQLite sürümlerinde değişken sınırı 999 (UNION ALL sınırı da 500)
+
+def feed_state(post_ids: list[str], device_id: str | None = None, comment_limit: int = FEED_COMMENT_LIMIT):
+    # Sayfadaki tüm kartlar için beğeni/yorum bilgisini tek bağlantıda toplu çek
+    # (kart başına 3 bağlantı + 3 sorgu yerine sayfa başına birkaç sorgu).
+    # device_id verilmezse "liked" None kalır: önbellekli sayfalarda tarayıcı
+    # kendi durumunu /begeni_durumu'ndan alır.
+    state = {
+        pid: {"likes": 0, "liked": None if device_id is None else False, "comments": [], "comment_count": 0}
+        for pid in post_ids
+    }
+    if not state:
+        return state
 
-def comments_for(post_id: str):
+    ids = list(state)
     con = db()
     cur = con.cursor()
-    cur.execute(
-        "SELECT id, name_full, comment, created_at FROM comments WHERE post_id=? ORDER BY id DESC",
-        (post_id,)
-    )
-    rows = cur.fetchall()
+    for i in range(0, len(ids), SQL_IN_CHUNK):
+        chunk = ids[i:i + SQL_IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+
+        cur.execute(f"SELECT post_id, like_count, comment_count FROM post_stats WHERE post_id IN ({marks})", chunk)
+        for r in cur.fetchall():
+            state[r["post_id"]]["likes"] = int(r["like_count"])
+            state[r["post_id"]]["comment_count"] = int(r["comment_count"])
+
+        if device_id is not None:
+            for pid in liked_posts(chunk, device_id, cur):
+                state[pid]["liked"] = True
+
+        # her post için en yeni N yorum: post başına index'ten LIMIT'li okuma, tek sorguda
+        # (binlerce yorumu olan postta bile sadece N satır okunur). Yorumsuz postlar atlanır.
+        with_comments = [pid for pid in chunk if state[pid]["comment_count"]]
+        if with_comments:
+            one = (
+                "SELECT * FROM (SELECT id, post_id, name_full, comment, created_at FROM comments "
+                f"WHERE post_id = ? ORDER BY id DESC LIMIT {int(comment_limit)})"
+            )
+            cur.execute(" UNION ALL ".join([one] * len(with_comments)), with_comments)
+            for r in cur.fetchall():
+                state[r["post_id"]]["comments"].append(r)
     con.close()
-    return rows
+    return state
 
 def add_comment(post_id: str, device_id: str, name_full: str, comment: str):
-    con = db()
-    cur = con.cursor()
-    cur.execute(
-        "INSERT INTO comments (post_id, device_id, name_full, comment, created_at) VALUES (?,?,?,?,?)",
-        (post_id, device_id, name_full, comment, datetime.now().isoformat(timespec="seconds"))
+    comment_id = write_queue.submit(
+        "comment", (post_id, device_id, name_full, comment, datetime.now().isoformat(timespec="seconds"))
     )
-    con.commit()
-    con.close()
+    response_cache.invalidate(post_id.partition(":")[0])
+    return comment_id
 
+@with_busy_retry
 def delete_comment(comment_id: int):
     con = db()
     cur = con.cursor()
     cur.execute("DELETE FROM comments WHERE id=?", (comment_id,))
     con.commit()
     con.close()
+    response_cache.invalidate("foto", "video")
 
 def is_admin() -> bool:
     return bool(session.get("is_admin"))
@@ -260,25 +1394,63 @@ def read_lines(path: str):
                     lines.append(t)
     return lines
 
-def append_line(path: str, text: str):
-    # yeni duyuru ekleyince eskisi silinmesin: dosyaya satır olarak ekle
-    text = (text or "").strip()
+contact_file = FileCache(CONTACT_FILE, read_lines, default=[])
+
+ANNOUNCE_PAGE_SIZE = 30
+
+@with_busy_retry
+def add_announcement(text: str):
+    # tek satır olarak sakla (eski TXT davranışı)
+    text = (text or "").replace("\n", " ").strip()
     if not text:
-        return
-    with open(path, "a", encoding="utf-8") as f:
-        # satır sonu garanti
-        f.write(text.replace("\n", " ").strip() + "\n")
+        return None
+    con = db()
+    cur = con.cursor()
+    cur.execute(
+        "INSERT INTO announcements (text, created_at) VALUES (?, ?)",
+        (text, datetime.now().isoformat(timespec="seconds"))
+    )
+    ann_id = cur.lastrowid
+    con.commit()
+    con.close()
+    response_cache.invalidate("duyuru")
+    return ann_id
 
-def write_lines(path: str, lines: list[str]):
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines).strip() + ("\n" if lines else ""))
+@with_busy_retry
+def delete_announcement(ann_id: int):
+    con = db()
+    con.execute("DELETE FROM announcements WHERE id=?", (ann_id,))
+    con.commit()
+    con.close()
+    response_cache.invalidate("duyuru")
+
+def announcements_page(before_id: int | None = None, limit: int = ANNOUNCE_PAGE_SIZE):
+    # en yeni üstte; id'ye göre keyset: geçmiş ne kadar uzun olursa olsun O(sayfa)
+    con = db()
+    cur = con.cursor()
+    if before_id is None:
+        cur.execute("SELECT id, text, created_at FROM announcements ORDER BY id DESC LIMIT ?", (limit + 1,))
+    else:
+        cur.execute(
+            "SELECT id, text, created_at FROM announcements WHERE id < ? ORDER BY id DESC LIMIT ?",
+            (before_id, limit + 1)
+        )
+    rows = cur.fetchall()
+    con.close()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, (rows[-1]["id"] if more and rows else None)
+
+def int_arg(name: str, default=None):
+    try:
+        return int(request.args.get(name, ""))
+    except ValueError:
+        return default
 
 
 # -------------------------
 # HAVA DURUMU (Open-Meteo) + cache
 # -------------------------
-_weather_cache = {"ts": 0.0, "data": None}
-
 def weather_icon_and_label(weather_code: int, wind_m_s: float):
     # Rüzgar varsa rüzgar simgesi
     if wind_m_s is not None and wind_m_s >= 9.0:
@@ -304,23 +1476,91 @@ def weather_icon_and_label(weather_code: int, wind_m_s: float):
         return "⛈️", "Fırtına"
     return "☁️", "Hava"
 
-def get_weather():
-    now = time.time()
-    if _weather_cache["data"] is not None and (now - _weather_cache["ts"] < 600):
-        return _weather_cache["data"]
+class WeatherRefresher:
+    # Stale-while-revalidate: istek hiçbir zaman ağı beklemez.
+    # Veri eskiyince ilk gelen istek arka planda TEK bir yenileme başlatır, o sırada
+    # herkes eski veriyi görür. Hata olursa eski veri korunur ve artan aralıklarla
+    # (WEATHER_RETRY_MIN .. WEATHER_RETRY_MAX) tekrar denenir.
+    PLACEHOLDER = {"ok": False, "temp": None, "icon": "☁️", "label": "Hava"}
+
+    def __init__(self, url: str, ttl: float, timeout: float):
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._data = None
+        self._ts = 0.0
+        self._failures = 0
+        self._next_try = 0.0
+        self._refreshing = False
+        self._pid = None
+        self.version = 0
+        # yenilemeyi başlatan fonksiyon; None = thread ile urlopen. ASGI sürümü
+        # (asgi.py) bunu event loop'ta httpx ile çeken bir görevle değiştirir.
+        self.spawner = None
+
+    def get(self) -> dict:
+        now = time.time()
+        if (self._data is None or now - self._ts >= self.ttl) and now >= self._next_try:
+            self._refresh_async()
+        return self._data or self.PLACEHOLDER
+
+    def _refresh_async(self):
+        with self._lock:
+            # fork sonrası ebeveyndeki "yenileniyor" bayrağı geçersiz
+            if self._refreshing and self._pid == os.getpid():
+                return
+            self._refreshing = True
+            self._pid = os.getpid()
+        if self.spawner is not None:
+            try:
+                self.spawner()
+                return
+            except Exception:
+                pass   # event loop yoksa (ör. kapanırken) thread ile devam
+        threading.Thread(target=self.refresh, name="weather", daemon=True).start()
+
+    def refresh(self):
+        try:
+            data = self.fetch()
+        except Exception:
+            self.failed()
+            return
+        self.store(data)
+
+    def store(self, data: dict):
+        with self._lock:
+            self._data = data
+            self.version += 1
+            self._ts = time.time()
+            self._failures = 0
+            self._next_try = 0.0
+            self._refreshing = False
+
+    def failed(self):
+        with self._lock:
+            self._failures += 1
+            delay = min(WEATHER_RETRY_MIN * (2 ** (self._failures - 1)), WEATHER_RETRY_MAX)
+            self._next_try = time.time() + delay
+            self._refreshing = False
+
+    PARAMS = {
+        "latitude": WEATHER_LAT,
+        "longitude": WEATHER_LON,
+        "current_weather": "true",
+        "timezone": "auto",
+    }
+    HEADERS = {"User-Agent": "DuzagacKoyuApp/1.0"}
 
-    try:
-        params = {
-            "latitude": WEATHER_LAT,
-            "longitude": WEATHER_LON,
-            "current_weather": "true",
-            "timezone": "auto",
-        }
-        url = "https://api.open-meteo.com/v1/forecast?" + urlencode(params)
-        req = Request(url, headers={"User-Agent": "DuzagacKoyuApp/1.0"})
-        with urlopen(req, timeout=6) as r:
+    def fetch(self) -> dict:
+        url = self.url + "?" + urlencode(self.PARAMS)
+        req = Request(url, headers=self.HEADERS)
+        with urlopen(req, timeout=self.timeout) as r:
             raw = r.read().decode("utf-8")
-        data = json.loads(raw)
+        return self.parse(json.loads(raw))
+
+    @staticmethod
+    def parse(data: dict) -> dict:
         cw = data.get("current_weather") or {}
         temp = cw.get("temperature")
         code = int(cw.get("weathercode", 3))
@@ -328,15 +1568,13 @@ def get_weather():
         wind_m_s = (wind / 3.6) if isinstance(wind, (int, float)) else 0.0
 
         icon, label = weather_icon_and_label(code, wind_m_s)
-        out = {"ok": True, "temp": temp, "icon": icon, "label": label}
-        _weather_cache["ts"] = now
-        _weather_cache["data"] = out
-        return out
-    except Exception:
-        out = {"ok": False, "temp": None, "icon": "☁️", "label": "Hava"}
-        _weather_cache["ts"] = now
-        _weather_cache["data"] = out
-        return out
+        return {"ok": True, "temp": temp, "icon": icon, "label": label}
+
+weather_refresher = WeatherRefresher(WEATHER_URL, WEATHER_TTL, WEATHER_TIMEOUT)
+
+@metrics.phase("weather")
+def get_weather():
+    return weather_refresher.get()
 
 
 # -------------------------
@@ -413,7 +1651,7 @@ BASE = """
 
     .page{
       min-height:calc(100vh - var(--top-h));padding:14px 14px 28px;
-      background:linear-gradient(rgba(0,0,0,.62),rgba(0,0,0,.62)),url("/static/arkaplan.jpg");
+      background:linear-gradient(rgba(0,0,0,.62),rgba(0,0,0,.62)),url("{{ bg_url }}");
       background-size:cover;background-position:center;background-repeat:no-repeat;
     }
     .container{max-width:760px;margin:0 auto;position:relative;}
@@ -459,9 +1697,16 @@ BASE = """
       outline:none;font-weight:700;margin-bottom:10px;}
     textarea.field{min-height:88px;resize:vertical;font-weight:700;}
     .commentItem{padding:10px 12px;border-radius:14px;border:1px solid rgba(255,255,255,.10);background:rgba(0,0,0,.18);margin-top:8px;}
+    .commentMore{margin-top:8px;width:100%;}
     .commentMeta{display:flex;justify-content:space-between;gap:10px;font-weight:900;margin-bottom:6px;}
     .commentMeta small{color:var(--muted);font-weight:900;}
     .row{display:flex;gap:10px;flex-wrap:wrap;align-items:center;justify-content:space-between;}
+    .videoPoster{position:relative;display:block;aspect-ratio:16/9;background:#000;overflow:hidden;}
+    .videoPoster img{width:100%;height:100%;object-fit:cover;}
+    .playBtn{position:absolute;left:50%;top:50%;transform:translate(-50%,-50%);width:64px;height:64px;border-radius:50%;
+      display:grid;place-items:center;font-size:26px;color:#fff;background:rgba(0,0,0,.55);border:1px solid rgba(255,255,255,.3);}
+    .vDur{position:absolute;right:8px;bottom:8px;padding:3px 7px;border-radius:8px;font-size:12px;font-weight:900;background:rgba(0,0,0,.7);}
+    .feedMore{display:flex;justify-content:center;padding:6px 0 14px;}
 
     @media (max-width:520px){
       .topRight{gap:6px;}
@@ -518,6 +1763,7 @@ BASE = """
       <a href="/fotograflar" class="{{ 'active' if path=='/fotograflar' else '' }}"><span>📷</span> Fotoğraflar</a>
       <a href="/duyuru" class="{{ 'active' if path=='/duyuru' else '' }}"><span>📢</span> Duyuru</a>
       <a href="/iletisim" class="{{ 'active' if path=='/iletisim' else '' }}"><span>☎</span> İletişim</a>
+      <a href="/ara" class="{{ 'active' if path=='/ara' else '' }}"><span>🔍</span> Ara</a>
 
       {% if admin %}
       <a href="/panel" class="{{ 'active' if path=='/panel' else '' }}"><span>⚙</span> Panel</a>
@@ -554,17 +1800,97 @@ BASE = """
     async function likePost(postId){
       const full = (prompt("Adın Soyadın (zorunlu):") || "").trim();
       if(!full){ alert("Adın Soyadın zorunlu!"); return; }
-      const res = await fetch("/like", {
+      const res = await fetch("/api/like", {
         method:"POST",
         headers:{"Content-Type":"application/x-www-form-urlencoded"},
-        body:new URLSearchParams({post_id:postId, name_full:full, next:window.location.pathname})
+        body:new URLSearchParams({post_id:postId, name_full:full})
+      });
+      const data = await res.json().catch(()=>({}));
+      if(!res.ok || !data.ok){ alert(data.error || "Beğeni kaydedilemedi."); return; }
+      document.querySelectorAll("button[data-like]").forEach(b=>{
+        if(b.dataset.like !== postId) return;
+        b.disabled = true;
+        const c = b.querySelector("[data-like-count]");
+        if(c) c.textContent = data.likes;
       });
-      if(res.redirected) window.location.href = res.url; else window.location.reload();
     }
     window.likePost = likePost;
 
+    // Yorum formu: sayfayı yeniden yüklemeden gönder, yeni yorumu listenin başına ekle
+    document.addEventListener("submit", async (e)=>{
+      const form = e.target.closest("form[data-ajax-comment]");
+      if(!form) return;
+      e.preventDefault();
+      const btn = form.querySelector("button[type=submit]");
+      if(btn) btn.disabled = true;
+      try{
+        const res = await fetch("/api/comment", {method:"POST", body:new URLSearchParams(new FormData(form))});
+        const data = await res.json().catch(()=>({}));
+        if(!res.ok || !data.ok){ alert(data.error || "Yorum gönderilemedi."); return; }
+        const card = form.closest(".card");
+        const list = card.querySelector(".commentList");
+        const empty = list.querySelector(".noComments");
+        if(empty) empty.remove();
+        list.insertAdjacentHTML("afterbegin", data.html);
+        const c = card.querySelector("[data-comment-count]");
+        if(c) c.textContent = data.comment_count;
+        const t = form.querySelector("textarea");
+        t.value = ""; t.dispatchEvent(new Event("input"));
+      }catch(err){
+        form.submit();
+      }finally{
+        if(btn) btn.disabled = false;
+      }
+    });
+
+    // Kartta sadece son birkaç yorum gelir; "Daha fazla yorum" sonraki sayfayı ekler
+    document.addEventListener("click", async (e)=>{
+      const btn = e.target.closest("button[data-comments-more]");
+      if(!btn) return;
+      btn.disabled = true;
+      try{
+        const res = await fetch(btn.dataset.commentsMore);
+        if(!res.ok) throw new Error(res.status);
+        const data = await res.json();
+        btn.insertAdjacentHTML("beforebegin", data.html);
+        if(data.more) btn.outerHTML = data.more; else btn.remove();
+      }catch(err){
+        btn.disabled = false;
+      }
+    });
+
+    // Sayfa HTML'i herkese aynı (önbellekli): bu cihazın beğenilerini ayrıca sor
+    async function syncLikes(){
+      const btns = [...document.querySelectorAll("button[data-like]:not([data-synced])")];
+      if(!btns.length) return;
+      btns.forEach(b=>b.dataset.synced="1");
+      try{
+        const res = await fetch("/begeni_durumu", {
+          method:"POST",
+          headers:{"Content-Type":"application/json"},
+          body:JSON.stringify({ids:btns.map(b=>b.dataset.like)})
+        });
+        const liked = new Set((await res.json()).liked || []);
+        btns.forEach(b=>{ if(liked.has(b.dataset.like)) b.disabled = true; });
+      }catch(err){}
+    }
+    syncLikes();
+
+    function playVideo(el){
+      const v = document.createElement("video");
+      v.controls = true; v.autoplay = true; v.playsInline = true; v.preload = "auto";
+      if(el.dataset.poster) v.poster = el.dataset.poster;
+      v.src = el.dataset.src;
+      el.replaceWith(v);
+      v.play().catch(()=>{});
+      return false;
+    }
+    window.playVideo = playVideo;
+
     function bindCounters(){
       document.querySelectorAll("textarea[data-maxlen='250']").forEach(t=>{
+        if(t.dataset.bound) return;
+        t.dataset.bound = "1";
         const c=document.getElementById(t.getAttribute("data-counter"));
         const max=250;
         const upd=()=>{ if(c) c.textContent=(max - t.value.length) + " / 250"; };
@@ -573,6 +1899,28 @@ BASE = """
     }
     bindCounters();
 
+    // Galeri: sayfa sonuna yaklaşınca devamını getir
+    function watchFeedMore(){
+      const el = document.querySelector(".feedMore[data-next]");
+      if(!el || !("IntersectionObserver" in window)) return;
+      const io = new IntersectionObserver(async (entries)=>{
+        if(!entries.some(e=>e.isIntersecting)) return;
+        io.disconnect();
+        try{
+          const res = await fetch(el.dataset.next, {headers:{"Accept":"application/json"}});
+          if(!res.ok) throw new Error(res.status);
+          const data = await res.json();
+          el.insertAdjacentHTML("afterend", data.html);
+          el.remove();
+          bindCounters();
+          syncLikes();
+          watchFeedMore();
+        }catch(err){ /* link hâlâ çalışır */ }
+      }, {rootMargin:"800px 0px"});
+      io.observe(el);
+    }
+    watchFeedMore();
+
     function isMobile(){
       return /Android|iPhone|iPad|iPod/i.test(navigator.userAgent || "");
     }
@@ -623,35 +1971,54 @@ BASE = """
 """
 
 
+_base_template = None
+
+def base_template():
+    # BASE bir kere derlenir; render_template_string her çağrıda baştan derliyordu
+    global _base_template
+    if _base_template is None:
+        _base_template = app.jinja_env.from_string(BASE)
+    return _base_template
+
+
+@metrics.phase("render")
 def render_page(title: str, content_html: str, show_weather: bool = False):
-    weather = get_weather() if show_weather else {"ok": False, "temp": None, "icon": "☁️", "label": "Hava"}
-    return render_template_string(
-        BASE,
+    weather = get_weather() if show_weather else WeatherRefresher.PLACEHOLDER
+    return render_template(
+        base_template(),
         title=title,
         content=content_html,
         path=request.path,
         admin=is_admin(),
         socials=SOCIALS,
         show_weather=show_weather,
-        weather=weather
+        weather=weather,
+        bg_url=versioned_url("/static/arkaplan.jpg", (file_version(BG_FILE) or (0,))[0]),
     )
 
 
-def post_card(kind: str, filename: str, media_html: str):
-    # sadece foto/video için kart (duyuru/iletisim burada kullanılmaz)
-    post_id = f"{kind}:{filename}"
-    device_id = get_device_id()
+STREAM_MARKER = "<!--duzagac:icerik-->"
 
-    likes = like_count(post_id)
-    liked = has_liked(post_id, device_id)
-    comments = comments_for(post_id)
+def render_page_stream(title: str, *parts, show_weather: bool = False):
+    # Uzun akışlar için: sayfa başı (menü, stil, script) hemen gönderilir, içerik
+    # parçalar geldikçe yazılır, sayfa sonu en sonda. parts: string listeleri/üreteçleri.
+    head, tail = render_page(title, STREAM_MARKER, show_weather).split(STREAM_MARKER, 1)
 
-    comment_html = ""
-    for r in comments[:50]:
-        nm = first_name(r["name_full"])
-        dt = fmt_date_ddmmyy(r["created_at"])
-        cmt = (r["comment"]).replace("<","&lt;").replace(">","&gt;")
-        comment_html += f"""
+    def gen():
+        yield head
+        for part in parts:
+            for chunk in part:
+                if chunk:
+                    yield chunk
+        yield tail
+    return app.response_class(stream_with_context(gen()), mimetype="text/html")
+
+
+def comment_item_html(r) -> str:
+    nm = first_name(r["name_full"])
+    dt = fmt_date_ddmmyy(r["created_at"])
+    cmt = (r["comment"]).replace("<","&lt;").replace(">","&gt;")
+    return f"""
         <div class="commentItem">
           <div class="commentMeta">
             <div>{nm} <small>• {dt}</small></div>
@@ -660,23 +2027,48 @@ def post_card(kind: str, filename: str, media_html: str):
         </div>
         """
 
+
+def comments_more_button(post_id: str, before_id: int) -> str:
+    # JS ile tıklanınca /yorumlar'dan sonraki sayfa listenin sonuna eklenir
+    url = "/yorumlar?" + urlencode({"post_id": post_id, "once": before_id})
+    return f'<button class="btn commentMore" type="button" data-comments-more="{url}">Daha fazla yorum</button>'
+
+@metrics.phase("html")
+def post_card(kind: str, filename: str, media_html: str, state: dict | None = None, page_path: str | None = None):
+    # sadece foto/video için kart (duyuru/iletisim burada kullanılmaz)
+    # state: feed_state() çıktısındaki bu posta ait kayıt (yoksa tek başına çekilir)
+    # page_path: JS'siz gönderimde dönülecek sayfa (/parca JSON'u değil, galerinin kendisi)
+    post_id = f"{kind}:{filename}"
+    if state is None:
+        state = feed_state([post_id])[post_id]
+
+    likes = state["likes"]
+    liked = state["liked"]
+    comments = state["comments"]
+
+    comment_html = ""
+    for r in comments[:FEED_COMMENT_LIMIT]:
+        comment_html += comment_item_html(r)
+    if comments and state["comment_count"] > len(comments):
+        comment_html += comments_more_button(post_id, comments[-1]["id"])
+
     like_btn = f"""
-      <button class="btn" {'disabled' if liked else ''} onclick="likePost('{post_id}')">
-        ❤️ Beğen ({likes})
+      <button class="btn" data-like="{post_id}" {'disabled' if liked else ''} onclick="likePost('{post_id}')">
+        ❤️ Beğen (<span data-like-count>{likes}</span>)
       </button>
     """
 
     return f"""
-    <div class="card">
+    <div class="card" id="p_{post_id.replace(':','_')}">
       <div class="cardHeader"><b>{filename}</b><div class="pill">{'Video' if kind=='video' else 'Foto'}</div></div>
       {media_html}
       <div class="actions">
         {like_btn}
-        <div class="btn" style="cursor:default;">💬 Yorumlar ({len(comments)})</div>
+        <div class="btn" style="cursor:default;">💬 Yorumlar (<span data-comment-count>{state["comment_count"]}</span>)</div>
       </div>
 
       <div class="commentBox">
-        <form method="POST" action="/comment">
+        <form method="POST" action="/comment" data-ajax-comment>
           <input class="field" name="name_full" placeholder="Adın Soyadın (zorunlu)" required>
           <textarea class="field" name="comment" maxlength="250" data-maxlen="250" data-counter="c_{post_id.replace(':','_')}"
             placeholder="Yorum yaz (max 250 karakter)..." required></textarea>
@@ -685,15 +2077,80 @@ def post_card(kind: str, filename: str, media_html: str):
             <button class="btn" type="submit">Gönder</button>
           </div>
           <input type="hidden" name="post_id" value="{post_id}">
-          <input type="hidden" name="next" value="{request.path}">
+          <input type="hidden" name="next" value="{page_path or request.path}">
         </form>
 
-        {comment_html if comment_html else '<div class="muted" style="margin-top:10px;">Henüz yorum yok.</div>'}
+        <div class="commentList">
+          {comment_html if comment_html else '<div class="muted noComments" style="margin-top:10px;">Henüz yorum yok.</div>'}
+        </div>
       </div>
     </div>
     """
 
 
+if METRICS_ENABLED:
+    @app.before_request
+    def metrics_begin():
+        metrics.begin()
+
+    @app.after_request
+    def metrics_server_timing(resp):
+        route = request.url_rule.rule if request.url_rule else "(eşleşmedi)"
+        if resp.is_streamed and not resp.direct_passthrough:
+            # akışlı sayfa: kartlar ve sorguları after_request'ten SONRA üretilir.
+            # Ölçüm yanıt kapanınca biter (histogram + aşamalar tam); başlıklar gövdeden
+            # önce gittiği için bu yanıtlarda Server-Timing yoktur.
+            # (direct_passthrough dosya yanıtlarında call_on_close çağrılmaz; hemen biter.)
+            st, method = metrics.current(), request.method
+            resp.call_on_close(lambda: metrics.finish(method, route, st))
+            return resp
+        done = metrics.finish(request.method, route)
+        if done:
+            total, phases, queries, connects = done
+            parts = [f"{k};dur={v * 1000:.2f}" for k, v in phases.items()]
+            parts.append(f'sql_count;desc="{queries} queries, {connects} connections"')  # başlık Latin-1: ASCII kalmalı
+            parts.append(f"total;dur={total * 1000:.2f}")
+            resp.headers["Server-Timing"] = ", ".join(parts)
+        return resp
+
+
+@app.get("/metrics")
+def metrics_endpoint():
+    # sadece ölçüm açıkken; admin olarak ya da DUZAGAC_METRICS_ALLOW'daki adresten
+    if not METRICS_ENABLED:
+        abort(404)
+    if request.remote_addr not in METRICS_ALLOW and not is_admin():
+        abort(404)
+    return app.response_class(metrics.prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@app.teardown_request
+def teardown_db(exc):
+    release_db()
+
+
+@app.after_request
+def static_cache_headers(resp):
+    # ?v= ile sürümlenmiş medya ve içerik adresli küçük resimler değişmez
+    if request.path.startswith("/static/") and resp.status_code in (200, 206, 304):
+        if request.path.startswith("/static/onizleme/"):
+            immutable = True
+        elif request.args.get("v"):
+            path = safe_join(STATIC_DIR, request.path[len("/static/"):])
+            try:
+                st = os.stat(path) if path else None
+            except OSError:
+                st = None
+            immutable = version_is_current(request.args.get("v"), st)
+        else:
+            immutable = False
+        if immutable:
+            resp.headers["Cache-Control"] = f"public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable"
+        elif request.args.get("v"):
+            resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
 @app.after_request
 def set_device_cookie(resp):
     if not request.cookies.get("dz_device"):
@@ -701,21 +2158,229 @@ def set_device_cookie(resp):
     return resp
 
 
+# -------------------------
+# SAYFA ÖNBELLEĞİ (anonim ziyaretçiler)
+# -------------------------
+RESPONSE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+RESPONSE_CACHE_MAX_ENTRIES = 512
+
+class ResponseCache:
+    # Cihazdan bağımsız sayfa çıktısı (beğeni durumu tarayıcıda /begeni_durumu ile işlenir).
+    # Her kayıt bağlı olduğu kapsamların sürümüyle saklanır: sürüm değişince (başka
+    # worker'daki yazma dahil) kayıt geçersizdir. Toplam boyutla sınırlı LRU.
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (version, scopes, body, mimetype)
+        self._size = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, version, scopes, body: bytes, mimetype: str):
+        if len(body) > self.max_bytes // 8:
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (version, frozenset(scopes), body, mimetype)
+            self._size += len(body)
+            while self._size > self.max_bytes or len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, *scopes):
+        # yazma yapan yerden hemen çağrılır; diğer worker'lar sürüm kontrolüyle anlar
+        scopes = set(scopes)
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e[1] & scopes]:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[2])
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_MAX_ENTRIES)
+
+def change_versions() -> dict[str, int]:
+    con = db()
+    rows = con.execute("SELECT scope, version FROM change_counters").fetchall()
+    con.close()
+    return {r["scope"]: r["version"] for r in rows}
+
+def file_version(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def settled_version(path: str):
+    # file_version, ama son MediaIndex.SETTLE_SECONDS içinde değiştiyse her çağrıda farklı:
+    # kaba mtime çözünürlüğünde aynı tik içindeki ikinci değişiklik kaçırılmasın
+    v = file_version(path)
+    if v is not None and time.time_ns() - v[0] < MediaIndex.SETTLE_SECONDS * 1e9:
+        return v + (time.time_ns(),)
+    return v
+
+def content_version(scopes) -> tuple:
+    # Sayfanın dayandığı her şeyin ucuz bir özeti: DB sayaçları, klasördeki dosyaların
+    # ad+mtime özeti, türev klasörünün mtime'ı (yeni küçük resim/kapak), dosya imzaları,
+    # hava durumu verisi. Hepsi süreçler arası paylaşılan durumdan gelir: gunicorn'un her
+    # worker'ı aynı içerik için aynı ETag'i üretir (süreç içi sayaç kullanılmaz).
+    counters = change_versions() if {"foto", "video", "duyuru"} & set(scopes) else {}
+    out = []
+    for sc in scopes:
+        if sc == "foto":
+            idx = media_index(PHOTOS_DIR, PHOTO_EXTS)
+            idx.items()
+            out.append((counters.get("foto", 0), idx.signature, settled_version(THUMBS_DIR)))
+        elif sc == "video":
+            idx = media_index(VIDEOS_DIR, VIDEO_EXTS)
+            idx.items()
+            out.append((counters.get("video", 0), idx.signature, settled_version(THUMBS_DIR)))
+        elif sc == "duyuru":
+            out.append(counters.get("duyuru", 0))
+        elif sc == "iletisim":
+            contact_file.get()
+            out.append(contact_file.signature)
+        elif sc == "hava":
+            # eskiyse arka planda yenilemeyi tetikler; her worker kendi kopyasını çeker
+            out.append(tuple(sorted(get_weather().items())))
+    return tuple(out)
+
+# Kod değişince (yeni sürüm/EXE) eski ETag'ler ve önbellek kayıtları geçersiz olsun
+APP_BUILD = int(os.path.getmtime(sys.executable if is_frozen() else os.path.abspath(__file__)))
+
+class _CacheTee:
+    # Akışlı yanıt: parçalar istemciye giderken biriktirilir, akış tamamlanınca
+    # önbelleğe yazılır. İstemci koparsa ya da sayfa çok büyükse saklanmaz.
+    # close() her durumda (HEAD, hiç okunmamış yanıt dahil) asıl üreteci kapatır.
+    def __init__(self, body, on_done, limit: int):
+        self.body = body
+        self.on_done = on_done
+        self.limit = limit
+
+    def __iter__(self):
+        parts, size = [], 0
+        for chunk in self.body:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if parts is not None:
+                parts.append(chunk)
+                size += len(chunk)
+                if size > self.limit:
+                    parts = None
+            yield chunk
+        if parts is not None:
+            self.on_done(b"".join(parts))
+
+    def close(self):
+        close = getattr(self.body, "close", None)
+        if close is not None:
+            close()
+
+def _tee_into_cache(resp, key, version, scopes):
+    resp.response = _CacheTee(
+        resp.response,
+        lambda body: response_cache.put(key, version, scopes, body, resp.mimetype),
+        response_cache.max_bytes // 8,
+    )
+
+def cached_page(*scopes):
+    # Anonim GET isteklerinde:
+    #  - içerik sürümünden ETag üretilir; tarayıcıdaki kopya güncelse 304 (render yok)
+    #  - değilse sayfa önbellekten verilir, orada da yoksa render edilip saklanır
+    # Admin her zaman taze görür.
+    def deco(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET" or is_admin():
+                return view(*args, **kwargs)
+            key = request.full_path
+            version = (APP_BUILD, file_version(BG_FILE)) + content_version(scopes)
+            etag = hashlib.sha1(repr((key, version)).encode("utf-8")).hexdigest()[:32]
+            if request.if_none_match.contains(etag):
+                resp = app.response_class(status=304)
+            else:
+                hit = response_cache.get(key, version)
+                if hit is not None:
+                    resp = app.response_class(hit[2], mimetype=hit[3])
+                else:
+                    resp = app.make_response(view(*args, **kwargs))
+                    if resp.status_code != 200:
+                        return resp
+                    if resp.is_streamed:
+                        _tee_into_cache(resp, key, version, scopes)
+                    else:
+                        response_cache.put(key, version, scopes, resp.get_data(), resp.mimetype)
+            resp.set_etag(etag)
+            resp.headers["Cache-Control"] = "no-cache"  # her seferinde ETag ile doğrula
+            return resp
+        return wrapper
+    return deco
+
+@app.post("/begeni_durumu")
+def like_status():
+    # önbellekli sayfalardaki beğen düğmeleri için cihaza özel durum
+    data = request.get_json(silent=True) or {}
+    ids = [str(x) for x in (data.get("ids") or [])][:500]
+    if not ids:
+        return {"liked": []}
+    return {"liked": liked_posts(ids, get_device_id())}
+
+
 # -------------------------
 # ANA SAYFA: TOP 3 FOTO (en çok beğeni) + HAVA
 # -------------------------
 def top3_photos_by_likes():
-    photos = list_media(PHOTOS_DIR, (".jpg", ".jpeg", ".png", ".webp"))
+    photos = list_media(PHOTOS_DIR, PHOTO_EXTS)
+    ts_by_name = {safe_filename(p["filename"]): p["ts"] for p in photos}
     items = []
+
+    # post_stats beğeniye göre indexli: sadece ilk 3'ü (ve eşit beğenili olanları) oku.
+    # Klasörden silinmiş fotoğrafların sayaçları atlanır.
+    con = db()
+    cur = con.cursor()
+    cur.execute(
+        "SELECT post_id, like_count FROM post_stats "
+        "WHERE like_count > 0 AND post_id LIKE 'foto:%' ORDER BY like_count DESC"
+    )
+    for r in cur:
+        if len(items) >= 3 and r["like_count"] < items[-1][1]:
+            break
+        fn = r["post_id"][len("foto:"):]
+        if fn in ts_by_name:
+            items.append((fn, int(r["like_count"]), ts_by_name[fn]))
+    con.close()
+
+    # 3'ten azsa beğenisiz en yeni fotoğraflarla tamamla
+    chosen = {fn for fn, _, _ in items}
     for p in photos:
+        if len(items) >= 3:
+            break
         fn = safe_filename(p["filename"])
-        post_id = f"foto:{fn}"
-        lc = like_count(post_id)
-        items.append((fn, lc, p["ts"]))
+        if fn not in chosen:
+            items.append((fn, 0, p["ts"]))
+
     items.sort(key=lambda x: (x[1], x[2]), reverse=True)  # beğeni, eşitlikte yeni
     return items[:3]
 
 @app.get("/")
+@cached_page("foto", "hava")
 def home():
     top3 = top3_photos_by_likes()
 
@@ -728,67 +2393,257 @@ def home():
         """
         return render_page("Ana Sayfa", html, show_weather=True)
 
-    html = ""
-    for fn, _, _ in top3:
-        url = f"/static/fotograflar/{quote(fn)}"
-        media = f"<img src='{url}' alt='{fn}'>"
-        html += post_card("foto", fn, media)
+    idx = media_index(PHOTOS_DIR, PHOTO_EXTS)
+    html = "".join(photo_cards([idx.get(fn) or {"filename": fn} for fn, _, _ in top3]))
 
     return render_page("Ana Sayfa", html, show_weather=True)
 
 
+# -------------------------
+# VİDEOLAR / FOTOĞRAFLAR
+# -------------------------
+STREAM_BATCH = 6   # akışlı sayfada her parçadaki kart sayısı (parça başına tek feed_state)
+
+def card_chunks(kind: str, items, media_html, batch: int, page_path: str | None = None):
+    # kartları batch'ler halinde üretir; her batch'in durumu tek sorguda çekilir
+    for i in range(0, len(items), batch):
+        part = items[i:i + batch]
+        names = [safe_filename(it["filename"]) for it in part]
+        states = feed_state([f"{kind}:{fn}" for fn in names])
+        yield "".join(
+            post_card(kind, fn, media_html(it), states[f"{kind}:{fn}"], page_path)
+            for it, fn in zip(part, names)
+        )
+
+def video_cards(items, batch: int | None = None, page_path: str | None = None):
+    return card_chunks("video", items, video_media_html, batch or len(items) or 1, page_path)
+
+def photo_cards(items, batch: int | None = None, page_path: str | None = None):
+    return card_chunks("foto", items, photo_media_html, batch or len(items) or 1, page_path)
+
+def more_marker(page_path: str, cursor: str | None):
+    # Sayfa sonu işareti: JS görünce /parca adresinden devamını çeker,
+    # JS yoksa normal link olarak sonraki sayfayı açar.
+    if not cursor:
+        return ""
+    q = urlencode({"after": cursor})
+    return f"""
+    <div class="feedMore" data-next="{page_path}/parca?{q}">
+      <a class="btn" href="{page_path}?{q}">Daha fazla</a>
+    </div>
+    """
+
+def gallery_chunks(page_path: str, folder: str, exts, page_size: int, cards, batch: int | None = None):
+    # (parça üreteci, hata) döner; bozuk cursor -> hata. Sayfa listesi hemen alınır,
+    # kartlar ise üreteç tüketildikçe (akış sırasında) oluşturulur.
+    try:
+        after = parse_media_cursor(request.args.get("after"))
+    except ValueError:
+        return None, True
+    items, cursor = media_index(folder, exts).page(after, page_size)
+
+    def gen():
+        yield from cards(items, batch, page_path)
+        yield more_marker(page_path, cursor)
+    return gen(), False
+
+def gallery_page(page_path: str, folder: str, exts, page_size: int, cards):
+    # (html, hata) döner; bozuk cursor -> hata
+    chunks, bad = gallery_chunks(page_path, folder, exts, page_size, cards)
+    return ("".join(chunks) if chunks else None), bad
+
+
 # -------------------------
 # VİDEOLAR / FOTOĞRAFLAR
 # -------------------------
 @app.get("/videolar")
+@cached_page("video")
 def videolar():
-    vids = list_media(VIDEOS_DIR, (".mp4", ".webm", ".mov"))
     html = ""
-    if not vids:
+    if not list_media(VIDEOS_DIR, VIDEO_EXTS):
         html += """
         <div class="card">
           <div class="cardHeader"><b>Videolar</b><div class="pill">Boş</div></div>
           <div class="cardBody"><div class="muted">static/videolar klasörüne video atınca burada çıkar.</div></div>
         </div>
         """
-    for v in vids[:50]:
-        fn = safe_filename(v["filename"])
-        url = f"/static/videolar/{quote(fn)}"
-        media = f"<video controls preload='metadata'><source src='{url}'></video>"
-        html += post_card("video", fn, media)
-    return render_page("Videolar", html, show_weather=False)
+    chunks, bad = gallery_chunks("/videolar", VIDEOS_DIR, VIDEO_EXTS, VIDEO_PAGE_SIZE, video_cards, STREAM_BATCH)
+    if bad:
+        return redirect("/videolar")
+    return render_page_stream("Videolar", [html], chunks, show_weather=False)
+
+@app.get("/videolar/parca")
+@cached_page("video")
+def videolar_parca():
+    html, bad = gallery_page("/videolar", VIDEOS_DIR, VIDEO_EXTS, VIDEO_PAGE_SIZE, video_cards)
+    if bad:
+        abort(400)
+    return {"html": html}
 
 @app.get("/fotograflar")
+@cached_page("foto")
 def fotograflar():
-    photos = list_media(PHOTOS_DIR, (".jpg", ".jpeg", ".png", ".webp"))
     html = ""
-    if not photos:
+    if not list_media(PHOTOS_DIR, PHOTO_EXTS):
         html += """
         <div class="card">
           <div class="cardHeader"><b>Fotoğraflar</b><div class="pill">Boş</div></div>
           <div class="cardBody"><div class="muted">static/fotograflar klasörüne foto atınca burada çıkar.</div></div>
         </div>
         """
-    for p in photos[:80]:
-        fn = safe_filename(p["filename"])
-        url = f"/static/fotograflar/{quote(fn)}"
-        media = f"<img src='{url}' alt='{fn}'>"
-        html += post_card("foto", fn, media)
-    return render_page("Fotoğraflar", html, show_weather=False)
+    chunks, bad = gallery_chunks("/fotograflar", PHOTOS_DIR, PHOTO_EXTS, PHOTO_PAGE_SIZE, photo_cards, STREAM_BATCH)
+    if bad:
+        return redirect("/fotograflar")
+    return render_page_stream("Fotoğraflar", [html], chunks, show_weather=False)
+
+@app.get("/fotograflar/parca")
+@cached_page("foto")
+def fotograflar_parca():
+    html, bad = gallery_page("/fotograflar", PHOTOS_DIR, PHOTO_EXTS, PHOTO_PAGE_SIZE, photo_cards)
+    if bad:
+        abort(400)
+    return {"html": html}
+
+
+# -------------------------
+# MEDYA: video akışı (Range/206, sendfile, proxy'ye devretme)
+# -------------------------
+class _StreamFile:
+    # Açık video dosyası; kapanınca (yanıt bitti ya da istemci koptu) akış hakkını iade eder.
+    # fileno() olduğu için gunicorn bununla sendfile() yapabilir.
+    def __init__(self, f, release):
+        self.f = f
+        self._release = release
+
+    def fileno(self):
+        return self.f.fileno()
+
+    def read(self, n=-1):
+        return self.f.read(n)
+
+    def close(self):
+        if self._release is not None:
+            self.f.close()
+            self._release()
+            self._release = None
+
+class _ByteRange:
+    # gunicorn dışı sunucular için: dosyanın sadece [start, start+length) kısmını parça parça ver
+    def __init__(self, f, length: int, chunk: int = 256 * 1024):
+        self.f = f
+        self.remaining = length
+        self.chunk = chunk
+
+    def __iter__(self):
+        while self.remaining > 0:
+            data = self.f.read(min(self.chunk, self.remaining))
+            if not data:
+                break
+            self.remaining -= len(data)
+            yield data
+
+    def close(self):
+        self.f.close()
+
+_media_streams = threading.BoundedSemaphore(MEDIA_MAX_STREAMS)
+
+@app.get("/medya/video/<path:filename>")
+def media_video(filename):
+    fn = safe_filename(filename)
+    if fn != filename or not fn.lower().endswith(VIDEO_EXTS):
+        abort(404)
+    path = os.path.join(VIDEOS_DIR, fn)
+    try:
+        st = os.stat(path)
+    except OSError:
+        abort(404)
+
+    size = st.st_size
+    etag = f"{st.st_mtime_ns:x}-{size:x}"
+    cache_control = (
+        f"public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable"
+        if version_is_current(request.args.get("v"), st) else "no-cache"
+    )
+
+    if request.if_none_match.contains(etag):
+        resp = app.response_class(status=304)
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = cache_control
+        return resp
+
+    # Önde nginx/apache varsa dosyayı o göndersin; worker hemen serbest kalır
+    if MEDIA_ACCEL == "nginx":
+        resp = app.response_class(status=200)
+        resp.headers["X-Accel-Redirect"] = MEDIA_ACCEL_PREFIX + quote(fn)
+        resp.headers["Cache-Control"] = cache_control
+        return resp
+    if MEDIA_ACCEL == "sendfile":
+        resp = app.response_class(status=200)
+        resp.headers["X-Sendfile"] = path
+        resp.headers["Cache-Control"] = cache_control
+        return resp
+
+    # Range: tek aralık destekli; If-Range eşleşmezse tüm dosya
+    start, end, status = 0, size, 200
+    rng = request.range
+    if rng is not None and ("If-Range" not in request.headers or request.if_range.etag == etag):
+        span = rng.range_for_length(size)
+        if span is not None:
+            start, end = span
+            status = 206
+        elif rng.units == "bytes" and len(rng.ranges) == 1:
+            resp = app.response_class(status=416)
+            resp.headers["Content-Range"] = f"bytes */{size}"
+            return resp
+
+    # Worker başına eşzamanlı akış sınırı: video izleyenler beğeni/yorum isteklerini boğmasın
+    if not _media_streams.acquire(blocking=False):
+        resp = app.response_class("Sunucu meşgul, biraz sonra tekrar deneyin.", status=503, mimetype="text/plain")
+        resp.headers["Retry-After"] = "2"
+        return resp
+
+    try:
+        f = open(path, "rb")
+        f.seek(start)
+    except OSError:
+        _media_streams.release()
+        abort(404)
+    f = _StreamFile(f, _media_streams.release)
+
+    length = end - start
+    if request.environ.get("SERVER_SOFTWARE", "").startswith("gunicorn"):
+        # gunicorn file_wrapper: dosyanın o anki konumundan Content-Length kadar sendfile() (sıfır kopya)
+        body = wrap_file(request.environ, f)
+    else:
+        body = _ByteRange(f, length)
+
+    resp = app.response_class(body, status=status, mimetype=guess_type(fn)[0] or "application/octet-stream",
+                              direct_passthrough=True)
+    resp.content_length = length
+    resp.headers["Accept-Ranges"] = "bytes"
+    if status == 206:
+        resp.headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    resp.set_etag(etag)
+    resp.last_modified = st.st_mtime
+    resp.headers["Cache-Control"] = cache_control
+    return resp
 
 
 # -------------------------
-# DUYURU (beğeni/yorum YOK) + TXT satır satır
+# DUYURU (beğeni/yorum YOK) + DB'den sayfa sayfa
 # -------------------------
 @app.get("/duyuru")
+@cached_page("duyuru")
 def duyuru():
-    lines = read_lines(ANNOUNCE_FILE)
+    rows, older = announcements_page(int_arg("once"))
     items = ""
-    if lines:
-        # en yeni en üst: dosyada sona ekliyoruz -> gösterirken ters çevir
-        for t in lines[::-1]:
-            safe = t.replace("<","&lt;").replace(">","&gt;")
-            items += f"<div class='commentItem'><div class='muted'>{safe}</div></div>"
+    if rows:
+        for r in rows:
+            safe = r["text"].replace("<","&lt;").replace(">","&gt;")
+            dt = fmt_date_ddmmyy(r["created_at"])
+            items += f"<div class='commentItem'><div class='muted'>{safe}</div><div class='muted'><small>{dt}</small></div></div>"
+        if older:
+            items += f"<div class='feedMore'><a class='btn' href='/duyuru?once={older}'>Daha eski</a></div>"
     else:
         items = "<div class='muted'>Henüz duyuru yok. Panelden duyuru ekleyebilirsin.</div>"
 
@@ -801,12 +2656,137 @@ def duyuru():
     return render_page("Duyuru", html, show_weather=False)
 
 
+# -------------------------
+# ARAMA (yorumlar + duyurular, FTS5)
+# -------------------------
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_TERMS = 8
+
+def tr_fold(text: str) -> str:
+    # _tr_fold_sql ile aynı katlama + küçük harf (İ/I Türkçe kurala göre)
+    return (text or "").replace("I", "ı").replace("İ", "i").lower()
+
+def search_terms(q: str) -> list[str]:
+    return re.findall(r"\w+", tr_fold(q))[:SEARCH_MAX_TERMS]
+
+def fts_query(terms: list[str]) -> str:
+    # her kelime önek olarak aranır (köy -> köyümüz); tırnak FTS sözdizimini etkisizleştirir
+    return " ".join(f'"{t}"*' for t in terms)
+
+def search_content(terms: list[str], page: int, limit: int = SEARCH_PAGE_SIZE):
+    if not terms:
+        return [], False
+    con = db()
+    rows = con.execute("""
+        SELECT s.rowid AS rid,
+               c.post_id, c.name_full, c.comment, c.created_at AS comment_at,
+               a.text, a.created_at AS announcement_at
+        FROM search_index s
+        LEFT JOIN comments c ON s.rowid % 2 = 0 AND c.id = s.rowid / 2
+        LEFT JOIN announcements a ON s.rowid % 2 = 1 AND a.id = s.rowid / 2
+        WHERE search_index MATCH ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+    """, (fts_query(terms), limit + 1, (page - 1) * limit)).fetchall()
+    con.close()
+    return rows[:limit], len(rows) > limit
+
+def highlight(text: str, terms: list[str]) -> str:
+    # eşleşen kelime başlarını <mark> ile işaretle (katlama uzunluğu değiştirmediyse)
+    def esc(t):
+        return t.replace("<", "&lt;").replace(">", "&gt;")
+    folded = tr_fold(text)
+    if not terms or len(folded) != len(text):
+        return esc(text)
+    pattern = re.compile(r"(?<!\w)(?:" + "|".join(re.escape(t) for t in terms) + r")\w*")
+    out, pos = [], 0
+    for m in pattern.finditer(folded):
+        out.append(esc(text[pos:m.start()]))
+        out.append(f"<mark>{esc(text[m.start():m.end()])}</mark>")
+        pos = m.end()
+    out.append(esc(text[pos:]))
+    return "".join(out)
+
+def post_url(post_id: str) -> str | None:
+    # postu içeren galeri sayfası: cursor post sayfanın ilk kartı olacak şekilde seçilir
+    # (ilk sayfa sadece en yeni kartları gösterir). Dosya yoksa None.
+    kind, _, filename = post_id.partition(":")
+    if kind == "video":
+        page, folder, exts = "/videolar", VIDEOS_DIR, VIDEO_EXTS
+    elif kind == "foto":
+        page, folder, exts = "/fotograflar", PHOTOS_DIR, PHOTO_EXTS
+    else:
+        return None
+    found, cursor = media_index(folder, exts).cursor_for(filename)
+    if not found:
+        return None
+    anchor = quote("p_" + post_id.replace(":", "_"))
+    return f"{page}?{urlencode({'after': cursor})}#{anchor}" if cursor else f"{page}#{anchor}"
+
+def search_hit_html(r, terms: list[str]) -> str:
+    if r["rid"] % 2:
+        return f"""
+        <div class="commentItem">
+          <div class="commentMeta"><div>📢 Duyuru <small>• {fmt_date_ddmmyy(r["announcement_at"])}</small></div></div>
+          <div class="muted">{highlight(r["text"], terms)}</div>
+        </div>
+        """
+    url = post_url(r["post_id"])
+    if url is None:   # post_id gerçek bir medya dosyası değil (silinmiş ya da uydurma)
+        return ""
+    kind, _, filename = r["post_id"].partition(":")
+    return f"""
+        <div class="commentItem">
+          <div class="commentMeta">
+            <div>{highlight(first_name(r["name_full"]), terms)} <small>• {fmt_date_ddmmyy(r["comment_at"])}</small></div>
+            <a class="btn" href="{escape(url)}">{'📹' if kind == 'video' else '📷'} {escape(filename)}</a>
+          </div>
+          <div class="muted">{highlight(r["comment"], terms)}</div>
+        </div>
+        """
+
+@app.get("/ara")
+@cached_page("foto", "video", "duyuru")
+def ara():
+    q = (request.args.get("q") or "").strip()[:100]
+    page = max(1, int_arg("sayfa", 1))
+    terms = search_terms(q)
+    rows, more = search_content(terms, page)
+
+    items = "".join(search_hit_html(r, terms) for r in rows)
+    if items:
+        if more:
+            items += f"<div class='feedMore'><a class='btn' href='/ara?{urlencode({'q': q, 'sayfa': page + 1})}'>Daha fazla</a></div>"
+    elif terms:
+        items = "<div class='muted'>Sonuç bulunamadı.</div>"
+    else:
+        items = "<div class='muted'>Yorumlarda ve duyurularda aramak için bir kelime yaz.</div>"
+
+    safe_q = q.replace('"', "&quot;").replace("<", "&lt;").replace(">", "&gt;")
+    html = f"""
+    <div class="card">
+      <div class="cardHeader"><b>Ara</b><div class="pill">Yorum + Duyuru</div></div>
+      <div class="cardBody">
+        <form method="GET" action="/ara">
+          <div class="row">
+            <input class="field" name="q" value="{safe_q}" placeholder="Kelime ya da isim..." style="flex:1" autofocus>
+            <button class="btn" type="submit">Ara</button>
+          </div>
+        </form>
+        {items}
+      </div>
+    </div>
+    """
+    return render_page("Ara", html, show_weather=False)
+
+
 # -------------------------
 # İLETİŞİM (beğeni/yorum YOK) + iletisim.txt satır satır
 # -------------------------
 @app.get("/iletisim")
+@cached_page("iletisim")
 def iletisim():
-    lines = read_lines(CONTACT_FILE)
+    lines = contact_file.get()
     items = ""
     if lines:
         for t in lines:
@@ -854,6 +2834,49 @@ def comment():
     return redirect(next_url)
 
 
+# JSON uçları: sayfayı yeniden çizmeden tek yazma + küçük yanıt
+@app.post("/api/like")
+def api_like():
+    post_id = (request.form.get("post_id") or "").strip()
+    name_full = (request.form.get("name_full") or "").strip()
+    if not post_id or not name_full:
+        return {"ok": False, "error": "Adın Soyadın zorunlu!"}, 400
+    added = add_like(post_id, get_device_id(), name_full)
+    likes, _ = post_counts(post_id)
+    return {"ok": True, "added": added, "liked": True, "likes": likes}
+
+@app.post("/api/comment")
+def api_comment():
+    post_id = (request.form.get("post_id") or "").strip()
+    name_full = (request.form.get("name_full") or "").strip()
+    text = (request.form.get("comment") or "").strip()
+    if not post_id or not name_full or not text:
+        return {"ok": False, "error": "Ad ve yorum zorunlu!"}, 400
+
+    if len(text) > 250:
+        text = text[:250]
+
+    created_at = datetime.now().isoformat(timespec="seconds")
+    comment_id = add_comment(post_id, get_device_id(), name_full, text)
+    _, comment_count = post_counts(post_id)
+    row = {"id": comment_id, "name_full": name_full, "comment": text, "created_at": created_at}
+    return {"ok": True, "id": comment_id, "html": comment_item_html(row), "comment_count": comment_count}
+
+
+@app.get("/yorumlar")
+@cached_page("foto", "video")
+def yorumlar():
+    # bir postun eski yorumları, sayfa sayfa (kartlardaki "Daha fazla yorum")
+    post_id = (request.args.get("post_id") or "").strip()
+    if not post_id:
+        abort(400)
+    rows, older = comments_for(post_id, int_arg("once"))
+    return {
+        "html": "".join(comment_item_html(r) for r in rows),
+        "more": comments_more_button(post_id, older) if older else "",
+    }
+
+
 # -------------------------
 # GİZLİ ADMIN GİRİŞ / ÇIKIŞ
 # -------------------------
@@ -902,21 +2925,142 @@ def admin_logout():
 # -------------------------
 # PANEL (SADECE ADMIN) + duyuru ekleme + silme
 # -------------------------
+PANEL_PAGE_SIZE = 50
+COMMENT_FILTER_FIELDS = ("f_post", "f_name", "f_from", "f_to")
+
+def comment_filters(src) -> dict:
+    # src: request.args / request.form; boş alanlar atlanır
+    out = {}
+    for k in COMMENT_FILTER_FIELDS:
+        v = (src.get(k) or "").strip()
+        if v:
+            out[k] = v
+    return out
+
+def comment_filter_sql(filters: dict):
+    # Her koşul bir index'e oturur: post_id -> idx_comments_post_id,
+    # ad (önek, Türkçe büyük/küçük harf duyarsız) -> idx_comments_name_fold, tarih -> idx_comments_created
+    where, params = [], []
+    if "f_post" in filters:
+        where.append("post_id = ?")
+        params.append(filters["f_post"])
+    if "f_name" in filters:
+        # önek aralığı: katlanmış ad >= önek ve < önek + en büyük kod noktası
+        name, prefix = _name_fold_sql("name_full"), _name_fold_sql("?")
+        where.append(f"{name} >= {prefix} AND {name} < {prefix} || char(1114111)")
+        params += [filters["f_name"], filters["f_name"]]
+    if "f_from" in filters:
+        where.append("created_at >= ?")
+        params.append(filters["f_from"])
+    if "f_to" in filters:
+        # bitiş günü dahil: 'YYYY-MM-DD' < 'YYYY-MM-DDT..' < 'YYYY-MM-DD~'
+        where.append("created_at < ?")
+        params.append(filters["f_to"] + "~")
+    return where, params
+
+def moderation_comments(filters: dict, before_id: int | None, limit: int = PANEL_PAGE_SIZE):
+    where, params = comment_filter_sql(filters)
+    if before_id is not None:
+        where.append("id < ?")
+        params.append(before_id)
+    sql = "SELECT id, post_id, name_full, comment, created_at FROM comments"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id DESC LIMIT ?"
+    con = db()
+    rows = con.execute(sql, [*params, limit + 1]).fetchall()
+    con.close()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, (rows[-1]["id"] if more and rows else None)
+
+@with_busy_retry
+def delete_comments(ids: list[int]) -> int:
+    # toplu silme: tek işlem (post_stats/sayaç trigger'ları aynı işlemde çalışır)
+    if not ids:
+        return 0
+    con = db()
+    cur = con.cursor()
+    deleted = 0
+    for i in range(0, len(ids), SQL_IN_CHUNK):
+        chunk = ids[i:i + SQL_IN_CHUNK]
+        cur.execute(f"DELETE FROM comments WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        deleted += cur.rowcount
+    con.commit()
+    con.close()
+    response_cache.invalidate("foto", "video")
+    return deleted
+
+@with_busy_retry
+def delete_comments_matching(filters: dict) -> int:
+    # spam dalgası: filtreye uyan tüm yorumlar tek işlemde (filtresiz çağrılamaz)
+    where, params = comment_filter_sql(filters)
+    if not where:
+        return 0
+    con = db()
+    cur = con.cursor()
+    cur.execute("DELETE FROM comments WHERE " + " AND ".join(where), params)
+    deleted = cur.rowcount
+    con.commit()
+    con.close()
+    response_cache.invalidate("foto", "video")
+    return deleted
+
+def panel_url(**changes) -> str:
+    # mevcut panel parametrelerini koruyarak link üret (None = kaldır)
+    args = {k: v for k, v in request.args.items()}
+    for k, v in changes.items():
+        if v is None:
+            args.pop(k, None)
+        else:
+            args[k] = v
+    return PANEL_PATH + ("?" + urlencode(args) if args else "")
+
+def _media_delete_list(folder, exts, arg, action):
+    try:
+        after = parse_media_cursor(request.args.get(arg))
+    except ValueError:
+        after = None
+    items, cursor = media_index(folder, exts).page(after, PANEL_PAGE_SIZE)
+    out = ""
+    for it in items:
+        fn = safe_filename(it["filename"])
+        out += f"""
+        <div class="commentItem">
+          <div class="commentMeta">
+            <div>{fn}</div>
+            <form method="POST" action="{action}" style="margin:0;">
+              <input type="hidden" name="filename" value="{fn}">
+              <button class="btn btnDanger" type="submit">Sil</button>
+            </form>
+          </div>
+        </div>
+        """
+    if cursor:
+        out += f"<div class='feedMore'><a class='btn' href='{panel_url(**{arg: cursor})}'>Sonraki</a></div>"
+    if request.args.get(arg):
+        out += f"<div class='feedMore'><a class='btn' href='{panel_url(**{arg: None})}'>Başa dön</a></div>"
+    return out, len(media_index(folder, exts).items())
+
 @app.route(PANEL_PATH, methods=["GET"])
 def panel():
     require_admin_or_404()
 
-    con = db()
-    cur = con.cursor()
-    cur.execute("SELECT id, post_id, name_full, comment, created_at FROM comments ORDER BY id DESC LIMIT 200")
-    comments = cur.fetchall()
-    con.close()
+    filters = comment_filters(request.args)
+    comments, comments_older = moderation_comments(filters, int_arg("yorum_once"))
+    anns, anns_older = announcements_page(int_arg("duyuru_once"))
+    vid_html, vid_total = _media_delete_list(VIDEOS_DIR, VIDEO_EXTS, "video_after", "/admin/delete_video")
+    photo_html, photo_total = _media_delete_list(PHOTOS_DIR, PHOTO_EXTS, "foto_after", "/admin/delete_photo")
+    deleted = int_arg("silindi")
+
+    def fval(k):
+        return (filters.get(k) or "").replace('"', "&quot;").replace("<", "&lt;")
 
-    vids = list_media(VIDEOS_DIR, (".mp4", ".webm", ".mov"))
-    photos = list_media(PHOTOS_DIR, (".jpg", ".jpeg", ".png", ".webp"))
-    anns = read_lines(ANNOUNCE_FILE)
+    filter_hidden = "".join(
+        f'<input type="hidden" name="{k}" value="{fval(k)}">' for k in filters
+    )
 
-    # Yorumlar
+    # Yorumlar (filtre + sayfa + toplu silme)
     com_html = ""
     for r in comments:
         nm = first_name(r["name_full"])
@@ -925,82 +3069,90 @@ def panel():
         com_html += f"""
         <div class="commentItem">
           <div class="commentMeta">
-            <div>{nm} <small>• {dt}</small></div>
-            <form method="POST" action="/admin/delete_comment" style="margin:0;">
-              <input type="hidden" name="comment_id" value="{r['id']}">
-              <button class="btn btnDanger" type="submit">Sil</button>
-            </form>
+            <label style="display:flex;gap:8px;align-items:center;cursor:pointer;">
+              <input type="checkbox" name="comment_ids" value="{r['id']}"> {nm} <small>• {dt}</small>
+            </label>
+            <button class="btn btnDanger" type="submit" formaction="/admin/delete_comment" name="comment_id" value="{r['id']}">Sil</button>
           </div>
           <div class="muted">{cmt}</div>
           <div class="muted"><small>Post: {r["post_id"]}</small></div>
         </div>
         """
-
-    # Video sil
-    vid_html = ""
-    for v in vids:
-        fn = safe_filename(v["filename"])
-        vid_html += f"""
-        <div class="commentItem">
-          <div class="commentMeta">
-            <div>{fn}</div>
-            <form method="POST" action="/admin/delete_video" style="margin:0;">
-              <input type="hidden" name="filename" value="{fn}">
-              <button class="btn btnDanger" type="submit">Sil</button>
-            </form>
+    if com_html:
+        com_html = f"""
+        <form method="POST" action="/admin/delete_comments">
+          {filter_hidden}
+          <div class="row" style="margin-bottom:6px;">
+            <label class="muted"><input type="checkbox" onclick="this.form.querySelectorAll('input[name=comment_ids]').forEach(c=>c.checked=this.checked)"> Sayfadakilerin hepsini seç</label>
+            <button class="btn btnDanger" type="submit">Seçilenleri sil</button>
           </div>
-        </div>
+          {com_html}
+        </form>
         """
-
-    # Foto sil
-    photo_html = ""
-    for p in photos:
-        fn = safe_filename(p["filename"])
-        photo_html += f"""
-        <div class="commentItem">
-          <div class="commentMeta">
-            <div>{fn}</div>
-            <form method="POST" action="/admin/delete_photo" style="margin:0;">
-              <input type="hidden" name="filename" value="{fn}">
-              <button class="btn btnDanger" type="submit">Sil</button>
-            </form>
-          </div>
-        </div>
+        if comments_older:
+            com_html += f"<div class='feedMore'><a class='btn' href='{panel_url(yorum_once=comments_older, silindi=None)}'>Daha eski</a></div>"
+    if filters:
+        com_html += f"""
+        <form method="POST" action="/admin/delete_comments" style="margin-top:10px;"
+              onsubmit="return confirm('Filtreye uyan TÜM yorumlar silinsin mi?')">
+          {filter_hidden}
+          <input type="hidden" name="all_matching" value="1">
+          <button class="btn btnDanger" type="submit">Filtreye uyan tüm yorumları sil</button>
+        </form>
         """
 
-    # Duyuru sil (dosyada son satır en yeni → panelde en yeni üstte gösteriyoruz)
+    filter_form = f"""
+    <form method="GET" action="{PANEL_PATH}">
+      <input class="field" name="f_post" value="{fval('f_post')}" placeholder="Post (ör. foto:resim.jpg)">
+      <input class="field" name="f_name" value="{fval('f_name')}" placeholder="Ad (baştan eşleşir)">
+      <div class="row">
+        <input class="field" type="date" name="f_from" value="{fval('f_from')}" style="flex:1">
+        <input class="field" type="date" name="f_to" value="{fval('f_to')}" style="flex:1">
+      </div>
+      <div class="row">
+        <button class="btn" type="submit">Filtrele</button>
+        <a class="btn" href="{PANEL_PATH}">Temizle</a>
+      </div>
+    </form>
+    """
+
+    # Duyuru sil (en yeni üstte, kalıcı id ile)
     ann_html = ""
     if anns:
-        for idx, t in enumerate(anns[::-1]):
-            safe = t.replace("<","&lt;").replace(">","&gt;")
+        for r in anns:
+            safe = r["text"].replace("<","&lt;").replace(">","&gt;")
             ann_html += f"""
             <div class="commentItem">
               <div class="commentMeta">
-                <div>{safe}</div>
+                <div>{safe} <small>• {fmt_date_ddmmyy(r["created_at"])}</small></div>
                 <form method="POST" action="/admin/delete_announcement" style="margin:0;">
-                  <input type="hidden" name="reverse_index" value="{idx}">
+                  <input type="hidden" name="announcement_id" value="{r['id']}">
                   <button class="btn btnDanger" type="submit">Sil</button>
                 </form>
               </div>
             </div>
             """
+        if anns_older:
+            ann_html += f"<div class='feedMore'><a class='btn' href='{panel_url(duyuru_once=anns_older)}'>Daha eski</a></div>"
     else:
         ann_html = "<div class='muted'>Duyuru yok.</div>"
 
     html = f"""
     <div class="card">
       <div class="cardHeader"><b>Panel</b><div class="pill">Yönetim</div></div>
-      <div class="cardBody"><div class="muted">Yorum / Video / Foto / Duyuru yönetimi.</div></div>
+      <div class="cardBody"><div class="muted">Yorum / Video / Foto / Duyuru yönetimi.</div>
+        {f'<div class="muted" style="margin-top:8px;"><b>{deleted} yorum silindi.</b></div>' if deleted is not None else ''}
+      </div>
     </div>
 
     <div class="card">
-      <div class="cardHeader"><b>Duyuru Ekle</b><div class="pill">TXT</div></div>
+      <div class="cardHeader"><b>Duyuru Ekle</b><div class="pill">DB</div></div>
       <div class="cardBody">
         <form method="POST" action="/admin/add_announcement">
           <input class="field" name="text" placeholder="Yeni duyuru yaz..." required>
           <button class="btn" type="submit">Ekle</button>
         </form>
-        <div class="muted" style="margin-top:10px;">Yeni duyuru eklenince eskileri silmez, dosyaya satır ekler.</div>
+        <div class="muted" style="margin-top:10px;">Yeni duyuru eklenince eskileri silmez, listenin en üstüne eklenir.</div>
       </div>
     </div>
 
@@ -1010,18 +3162,21 @@ def panel():
     </div>
 
     <div class="card">
-      <div class="cardHeader"><b>Videoları Sil</b><div class="pill">Dosya</div></div>
+      <div class="cardHeader"><b>Videoları Sil</b><div class="pill">{vid_total} dosya</div></div>
       <div class="cardBody">{vid_html if vid_html else "<div class='muted'>Video yok.</div>"}</div>
     </div>
 
     <div class="card">
-      <div class="cardHeader"><b>Fotoğrafları Sil</b><div class="pill">Dosya</div></div>
+      <div class="cardHeader"><b>Fotoğrafları Sil</b><div class="pill">{photo_total} dosya</div></div>
       <div class="cardBody">{photo_html if photo_html else "<div class='muted'>Foto yok.</div>"}</div>
     </div>
 
-    <div class="card">
+    <div class="card" id="yorumlar">
       <div class="cardHeader"><b>Yorumları Sil</b><div class="pill">DB</div></div>
-      <div class="cardBody">{com_html if com_html else "<div class='muted'>Henüz yorum yok.</div>"}</div>
+      <div class="cardBody">
+        {filter_form}
+        {com_html if com_html else "<div class='muted'>Yorum yok.</div>"}
+      </div>
     </div>
     """
     return render_page("Panel", html, show_weather=False)
@@ -1032,55 +3187,72 @@ def admin_add_announcement():
     require_admin_or_404()
     text = (request.form.get("text") or "").strip()
     if text:
-        append_line(ANNOUNCE_FILE, text)  # ESKİYİ SİLMEZ
+        add_announcement(text)  # ESKİYİ SİLMEZ
     return redirect(PANEL_PATH)
 
 
 @app.post("/admin/delete_comment")
 def admin_delete_comment():
     require_admin_or_404()
+    filters = comment_filters(request.form)
+    back = PANEL_PATH + ("?" + urlencode(filters) if filters else "")
     try:
         cid = int(request.form.get("comment_id", "0"))
     except:
-        return redirect(PANEL_PATH)
+        return redirect(back)
     delete_comment(cid)
-    return redirect(PANEL_PATH)
+    return redirect(back)
+
+@app.post("/admin/delete_comments")
+def admin_delete_comments():
+    require_admin_or_404()
+    filters = comment_filters(request.form)
+    if request.form.get("all_matching"):
+        deleted = delete_comments_matching(filters)
+    else:
+        ids = []
+        for v in request.form.getlist("comment_ids"):
+            try:
+                ids.append(int(v))
+            except ValueError:
+                pass
+        deleted = delete_comments(ids)
+    return redirect(PANEL_PATH + "?" + urlencode({**filters, "silindi": deleted}) + "#yorumlar")
 
 @app.post("/admin/delete_video")
 def admin_delete_video():
     require_admin_or_404()
     fn = safe_filename(request.form.get("filename", ""))
-    if not fn.lower().endswith((".mp4", ".webm", ".mov")):
+    if not fn.lower().endswith(VIDEO_EXTS):
         return redirect(PANEL_PATH)
     path = os.path.join(VIDEOS_DIR, fn)
     if os.path.isfile(path):
         os.remove(path)
+    video_previews.remove(fn)
+    response_cache.invalidate("video")
     return redirect(PANEL_PATH)
 
 @app.post("/admin/delete_photo")
 def admin_delete_photo():
     require_admin_or_404()
     fn = safe_filename(request.form.get("filename", ""))
-    if not fn.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
+    if not fn.lower().endswith(PHOTO_EXTS):
         return redirect(PANEL_PATH)
     path = os.path.join(PHOTOS_DIR, fn)
     if os.path.isfile(path):
         os.remove(path)
+    thumbnails.remove(fn)
+    response_cache.invalidate("foto")
     return redirect(PANEL_PATH)
 
 @app.post("/admin/delete_announcement")
 def admin_delete_announcement():
     require_admin_or_404()
-    lines = read_lines(ANNOUNCE_FILE)
     try:
-        rev_idx = int(request.form.get("reverse_index", "-1"))
+        ann_id = int(request.form.get("announcement_id", "0"))
     except:
         return redirect(PANEL_PATH)
-    # ekranda ters gösteriyoruz → gerçek index
-    real_index = (len(lines) - 1) - rev_idx
-    if 0 <= real_index < len(lines):
-        del lines[real_index]
-        write_lines(ANNOUNCE_FILE, lines)
+    delete_announcement(ann_id)
     return redirect(PANEL_PATH)
 
 
@@ -1090,10 +3262,39 @@ def admin_delete_announcement():
 def open_browser():
     webbrowser.open("http://127.0.0.1:5050")
 
+GUNICORN_CONF = os.path.join(BUNDLE_DIR, "gunicorn.conf.py")
+
+def run_production():
+    # gunicorn'u gunicorn.conf.py ile bu süreçten başlat (app zaten yüklü: ikinci import yok)
+    if os.environ.get("DUZAGAC_WORKER_CLASS", "").strip().lower() == "gevent":
+        # gevent: monkey patch worker içinde yapılır, app'in kilitleri/thread-local'ları
+        # ondan SONRA oluşmalı. Bu süreçte app zaten yüklü; gunicorn'u yeni süreçle
+        # "app:app" olarak başlat ki app her worker'da import edilsin.
+        os.execv(sys.executable, [
+            sys.executable, "-m", "gunicorn", "-c", GUNICORN_CONF, "--chdir", BASE_DIR, "app:app",
+        ])
+    from gunicorn.app.base import Application
+
+    class ProductionServer(Application):
+        def load_config(self):
+            self.load_config_from_file(GUNICORN_CONF)
+
+        def load(self):
+            return app
+
+    ProductionServer().run()
+
 if __name__ == "__main__":
-    import os
-    port = int(os.environ.get("PORT", 5050))
-    app.run(host="0.0.0.0", port=port, debug=False)
+    # python app.py            -> geliştirme sunucusu (Windows/EXE dahil her yerde)
+    # python app.py --uretim   -> gunicorn (DUZAGAC_SERVER=gunicorn ile de seçilir)
+    production = "--uretim" in sys.argv or os.environ.get("DUZAGAC_SERVER", "").lower() == "gunicorn"
+    if production and os.name != "nt":
+        run_production()
+    else:
+        if production:
+            print("gunicorn Windows'ta çalışmaz; geliştirme sunucusu açılıyor.")
+        port = int(os.environ.get("PORT", 5050))
+        app.run(host="0.0.0.0", port=port, debug=False)
 
 
 
@@ -0,0 +1,201 @@
+# ASGI sürümü: aynı Flask route'ları, binlerce yavaş/boşta bağlantıyı tek çekirdekte tutmak için
+#
+#   uvicorn asgi:app --host 0.0.0.0 --port 5050
+#   gunicorn asgi:app -k uvicorn.workers.UvicornWorker   (çok çekirdek)
+#
+# Bağlantılar event loop'ta tutulur. İstek gövdesi ve yanıt async okunur/yazılır.
+# Route kodu (SQLite, dosya, şablon) sınırlı bir thread havuzunda çalışır. Yavaş
+# 3G istemci bir thread'i değil sadece bir coroutine'i bekletir: thread yanıtı
+# ürettiği anda havuza döner. Büyük yanıtlar (video, akışlı sayfa) parça parça
+# thread'de okunup async gönderilir. Hava durumu event loop'ta httpx ile çekilir.
+import contextvars
+import os
+import sys
+from io import BytesIO
+
+import anyio
+import anyio.from_thread
+import anyio.to_thread
+import httpx
+
+import app as duzagac
+
+ASGI_THREADS = int(os.environ.get("DUZAGAC_ASGI_THREADS", "16"))
+SEND_CHUNK = 64 * 1024   # thread'e her gidişte en az bu kadar yanıt gövdesi okunur
+
+wsgi_app = duzagac.app.wsgi_app
+
+
+def build_environ(scope, body: bytes) -> dict:
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "SERVER_SOFTWARE": "duzagac-asgi",
+        "REMOTE_ADDR": client[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope["headers"]:
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_TYPE" or name == "CONTENT_LENGTH":
+            environ[name] = value
+            continue
+        key = "HTTP_" + name
+        if key in environ:
+            value = environ[key] + ("; " if key == "HTTP_COOKIE" else ",") + value
+        environ[key] = value
+    environ.setdefault("CONTENT_LENGTH", str(len(body)))
+    return environ
+
+
+def _drain(it) -> tuple[list[bytes], bool]:
+    # thread'de: en az SEND_CHUNK kadar parça topla; (parçalar, bitti mi)
+    chunks, size = [], 0
+    for chunk in it:
+        if chunk:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= SEND_CHUNK:
+                return chunks, False
+    return chunks, True
+
+
+def _start(environ):
+    # thread'de: route'u çalıştır, durum/başlıkları ve gövdenin ilk kısmını al
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+        return lambda data: None   # eski write() API'si kullanılmıyor
+
+    result = wsgi_app(environ, start_response)
+    it = iter(result)
+    try:
+        chunks, done = _drain(it)
+    except BaseException:
+        _close(result)
+        raise
+    return started, result, it, chunks, done
+
+
+def _close(result):
+    close = getattr(result, "close", None)
+    if close is not None:
+        close()
+
+
+async def read_body(receive) -> bytes:
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return bytes(body)
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return bytes(body)
+
+
+async def watch_disconnect(receive, scope):
+    # istemci koparsa gönderimi durdur (uvicorn kopuk bağlantıya send'i sessizce yutar)
+    while (await receive())["type"] != "http.disconnect":
+        pass
+    scope.cancel()
+
+
+async def http(scope, receive, send):
+    body = await read_body(receive)
+    environ = build_environ(scope, body)
+    # Flask/Werkzeug bağlamı contextvars'ta: akışlı yanıtın her parçası (ve close) aynı
+    # context'te çalışmalı, thread'ler değişse de. Yoksa stream_with_context bağlamı kaybolur.
+    ctx = contextvars.copy_context()
+    started, result, it, chunks, done = await anyio.to_thread.run_sync(
+        ctx.run, _start, environ, limiter=limiter
+    )
+    try:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(watch_disconnect, receive, tg.cancel_scope)
+            await send({"type": "http.response.start", "status": started["status"], "headers": started["headers"]})
+            while True:
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": not done})
+                if done:
+                    break
+                chunks, done = await anyio.to_thread.run_sync(ctx.run, _drain, it, limiter=limiter)
+            tg.cancel_scope.cancel()
+    finally:
+        # istemci koptuysa da: video akış hakkı, DB işlemi vs. thread'de serbest bırakılır
+        with anyio.CancelScope(shield=True):
+            await anyio.to_thread.run_sync(ctx.run, _close, result, limiter=limiter)
+
+
+# -------------------------
+# Hava durumu: event loop'ta httpx ile (thread + urlopen yerine)
+# -------------------------
+async def refresh_weather():
+    w = duzagac.weather_refresher
+    try:
+        r = await weather_client.get(w.url, params=w.PARAMS)
+        r.raise_for_status()
+        data = w.parse(r.json())
+    except Exception:
+        w.failed()
+        return
+    w.store(data)
+
+
+def spawn_weather_refresh():
+    # route thread'inden çağrılır (anyio worker thread'i): görevi event loop'a bırak
+    anyio.from_thread.run_sync(task_group.start_soon, refresh_weather)
+
+
+async def lifespan(receive, send):
+    global weather_client, task_group, limiter
+    limiter = anyio.CapacityLimiter(ASGI_THREADS)
+    async with anyio.create_task_group() as tg:
+        task_group = tg
+        weather_client = httpx.AsyncClient(
+            timeout=duzagac.WEATHER_TIMEOUT, headers=duzagac.WeatherRefresher.HEADERS
+        )
+        duzagac.weather_refresher.spawner = spawn_weather_refresh
+        try:
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    duzagac.weather_refresher.spawner = None
+                    await weather_client.aclose()
+                    await anyio.to_thread.run_sync(duzagac.write_queue.close)
+                    tg.cancel_scope.cancel()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        finally:
+            duzagac.weather_refresher.spawner = None
+
+
+limiter = None
+task_group = None
+weather_client = None
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "http":
+        global limiter
+        if limiter is None:   # lifespan desteklemeyen sunucu
+            limiter = anyio.CapacityLimiter(ASGI_THREADS)
+        await http(scope, receive, send)
+    elif scope["type"] == "lifespan":
+        await lifespan(receive, send)
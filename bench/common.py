@@ -0,0 +1,38 @@
+# Benchmark'lar için ortak yardımcılar.
+#
+# app.py dosyaları (data.db, static/, duyurular.txt ...) kendi yanında tutar; bu yüzden
+# benchmark'lar app.py'nin geçici bir klasöre kopyasını import eder, gerçek veriye dokunmaz.
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_workspace(prefix: str = "duzagac_bench_") -> str:
+    work = tempfile.mkdtemp(prefix=prefix)
+    shutil.copy2(os.path.join(REPO_DIR, "app.py"), os.path.join(work, "app.py"))
+    return work
+
+
+def load_app(work: str, env: dict | None = None):
+    # env: import sırasında okunan DUZAGAC_* ayarları
+    for k, v in (env or {}).items():
+        os.environ[k] = str(v)
+    spec = importlib.util.spec_from_file_location("app", os.path.join(work, "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["app"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values, p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * p / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
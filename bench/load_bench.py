@@ -0,0 +1,286 @@
+# Sayfa ve yazma uçlarının yük testi: sentetik veri, birkaç ölçek, JSON çıktı
+#
+#   python bench/load_bench.py [--scales 100,10000,100000] [--requests 200]
+#                              [--gunicorn] [--workers 2] [--threads 4] [--concurrency 16]
+#                              [--out bench/results/sonuc.json]
+#
+# Her ölçek için geçici klasöre app.py kopyalanır ve şunlarla doldurulur:
+#   - ölçek kadar foto, ölçek/10 video (içerik sahte: önizleme üretilemez, bir kere denenir)
+#   - ölçek kadar beğeni ve yorum (postlara Zipf benzeri dağıtılır: birkaç popüler post)
+# Sonra /, /fotograflar, /videolar, /like ve /comment ölçülür:
+#   - Flask test client: sayfa önbelleği boş (cold) ve dolu (warm), istek başına SQL sayısı
+#   - --gunicorn: yerel gunicorn'a eşzamanlı HTTP (SQL sayısı dışarıdan ölçülemez: null)
+# Hava durumu adresi kapalı bir porta yönlendirilir; ağ beklenmez.
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from common import REPO_DIR, load_app, make_workspace, percentile
+
+PAGES = ("/", "/fotograflar", "/videolar")
+WRITES = ("/like", "/comment")
+BENCH_ENV = {"DUZAGAC_WEATHER_URL": "http://127.0.0.1:9/"}
+
+
+# -------------------------
+# Sentetik veri
+# -------------------------
+def seed(A, scale: int, rng: random.Random):
+    photos = [f"foto_{i:06d}.jpg" for i in range(scale)]
+    videos = [f"video_{i:05d}.mp4" for i in range(max(1, scale // 10))]
+    for fn in photos:
+        with open(os.path.join(A.PHOTOS_DIR, fn), "wb") as f:
+            f.write(b"\xff\xd8bench")
+    for fn in videos:
+        with open(os.path.join(A.VIDEOS_DIR, fn), "wb") as f:
+            f.write(b"\x00" * 1024)
+
+    posts = [f"foto:{fn}" for fn in photos] + [f"video:{fn}" for fn in videos]
+    weights = [1.0 / (i + 1) for i in range(len(posts))]
+    base = datetime(2024, 1, 1)
+
+    def rows(n):
+        for i, post_id in enumerate(rng.choices(posts, weights=weights, k=n)):
+            yield post_id, i, (base + timedelta(minutes=i)).isoformat(timespec="seconds")
+
+    con = A.db()
+    con.executemany(
+        "INSERT OR IGNORE INTO likes (post_id, device_id, name_full, created_at) VALUES (?, ?, ?, ?)",
+        ((p, f"seed-{i}", "Köylü Bir", t) for p, i, t in rows(scale))
+    )
+    con.executemany(
+        "INSERT INTO comments (post_id, device_id, name_full, comment, created_at) VALUES (?, ?, ?, ?, ?)",
+        ((p, f"seed-{i}", "Köylü Bir", f"Yorum {i}: çok güzel olmuş", t) for p, i, t in rows(scale))
+    )
+    con.commit()
+    con.close()
+    return posts[:50]   # yazma istekleri popüler postlara gider
+
+
+# -------------------------
+# SQL sayacı (sadece süreç içi)
+# -------------------------
+class QueryCounter:
+    def __init__(self, A):
+        self.count = 0
+        self._lock = threading.Lock()
+        connect = A._connect
+
+        def counted_connect():
+            con = connect()
+            con.set_trace_callback(self._trace)
+            return con
+
+        A._connect = counted_connect
+        A.release_db()
+        A._db_local.con = None   # mevcut bağlantı da sayılsın
+
+    def _trace(self, sql):
+        if not sql.lstrip().startswith("--"):   # trigger içi satırlar "-- TRIGGER" ile gelir
+            with self._lock:
+                self.count += 1
+
+
+def request_plan(route: str, posts: list[str], n: int):
+    # (method, path, form, cookie) — yazmalarda her istek ayrı cihaz: beğeni gerçekten eklenir
+    out = []
+    for i in range(n):
+        if route in PAGES:
+            out.append(("GET", route, None, "bench-reader"))
+        else:
+            form = {"post_id": posts[i % len(posts)], "name_full": "Yük Testi", "next": "/"}
+            if route == "/comment":
+                form["comment"] = f"yük testi {i}"
+            out.append(("POST", route, form, f"bench-{route.strip('/')}-{i}-{random.random()}"))
+    return out
+
+
+def summarize(latencies_ms: list[float], elapsed: float, queries: list[int] | None):
+    return {
+        "requests": len(latencies_ms),
+        "throughput_rps": round(len(latencies_ms) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+# -------------------------
+# Flask test client
+# -------------------------
+def run_test_client(A, posts: list[str], n: int):
+    counter = QueryCounter(A)
+    client = A.app.test_client()
+    results = {}
+    modes = [(r, m) for r in PAGES for m in ("cold", "warm")] + [(r, "write") for r in WRITES]
+    for route, mode in modes:
+        lat, queries = [], []
+        plan = request_plan(route, posts, n)
+        if mode == "warm":
+            warm = client.get(route)
+            warm.get_data()   # akışlı sayfa: gövde bitince önbelleğe yazılır
+            warm.close()
+        t_start = time.perf_counter()
+        for method, path, form, device in plan:
+            if mode == "cold":
+                A.response_cache.clear()
+            client.set_cookie("dz_device", device)
+            before = counter.count
+            t0 = time.perf_counter()
+            resp = client.open(path, method=method, data=form)
+            resp.get_data()   # akışlı sayfalarda kartlar gövde okunurken üretilir
+            resp.close()
+            lat.append((time.perf_counter() - t0) * 1000.0)
+            queries.append(counter.count - before)
+            assert resp.status_code in (200, 302), (path, resp.status_code)
+        results[f"{route} {mode}"] = summarize(lat, time.perf_counter() - t_start, queries)
+    return results
+
+
+# -------------------------
+# gunicorn
+# -------------------------
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(work: str, workers: int, threads: int):
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "--threads", str(threads),
+         "-b", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"],
+        cwd=work, env={**os.environ, **BENCH_ENV},
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return proc, port
+        except OSError:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("gunicorn başlatılamadı")
+
+
+def run_http(port: int, posts: list[str], n: int, concurrency: int):
+    results = {}
+    for route in PAGES + WRITES:
+        plan = request_plan(route, posts, n)
+        lat = []
+        lat_lock = threading.Lock()
+        start = threading.Barrier(concurrency + 1)
+
+        def worker(part):
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)   # keep-alive
+            local = []
+            start.wait()
+            for method, path, form, device in part:
+                body = urlencode(form) if form else None
+                headers = {"Cookie": f"dz_device={device}"}
+                if body:
+                    headers["Content-Type"] = "application/x-www-form-urlencoded"
+                t0 = time.perf_counter()
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                local.append((time.perf_counter() - t0) * 1000.0)
+                assert resp.status in (200, 302), (path, resp.status)
+            conn.close()
+            with lat_lock:
+                lat.extend(local)
+
+        ts = [threading.Thread(target=worker, args=(plan[i::concurrency],)) for i in range(concurrency)]
+        for t in ts:
+            t.start()
+        start.wait()
+        t0 = time.perf_counter()
+        for t in ts:
+            t.join()
+        results[f"{route} c{concurrency}"] = summarize(lat, time.perf_counter() - t0, None)
+    return results
+
+
+def run_scale(scale: int, args) -> dict:
+    rng = random.Random(scale)
+    work = make_workspace()
+    try:
+        A = load_app(work, BENCH_ENV)
+        t0 = time.perf_counter()
+        posts = seed(A, scale, rng)
+        out = {"seed_s": round(time.perf_counter() - t0, 2)}
+        out["test_client"] = run_test_client(A, posts, args.requests)
+        A.write_queue.close()
+        A.release_db()
+        if args.gunicorn:
+            proc, port = start_gunicorn(work, args.workers, args.threads)
+            try:
+                out["gunicorn"] = {
+                    "workers": args.workers, "threads": args.threads,
+                    "results": run_http(port, posts, args.requests, args.concurrency),
+                }
+            finally:
+                proc.terminate()
+                proc.wait(timeout=10)
+        return out
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def print_table(scale: int, name: str, results: dict):
+    print(f"\n[{scale} kayıt] {name}")
+    for key, r in results.items():
+        q = r["queries_per_request"]
+        print(f"  {key:<22} {r['throughput_rps'] or 0:9.1f} istek/sn   p50 {r['p50_ms']:7.2f}  "
+              f"p95 {r['p95_ms']:7.2f}  p99 {r['p99_ms']:7.2f} ms"
+              + (f"   {q:g} sorgu/istek" if q is not None else ""))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", default="100,10000")
+    ap.add_argument("--requests", type=int, default=200, help="uç başına istek")
+    ap.add_argument("--gunicorn", action="store_true")
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--threads", type=int, default=4)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--out")
+    args = ap.parse_args()
+
+    report = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "args": vars(args),
+        "scales": {},
+    }
+    for scale in (int(s) for s in args.scales.split(",")):
+        r = run_scale(scale, args)
+        report["scales"][str(scale)] = r
+        print_table(scale, f"test client (seed {r['seed_s']} sn)", r["test_client"])
+        if "gunicorn" in r:
+            print_table(scale, f"gunicorn {args.workers}w x {args.threads}t", r["gunicorn"]["results"])
+
+    out = args.out or os.path.join(
+        REPO_DIR, "bench", "results", f"load-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nsonuç: {out}")
+
+
+if __name__ == "__main__":
+    main()
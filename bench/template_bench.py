@@ -0,0 +1,64 @@
+# BASE şablonu: her istekte derleme (eski yol) vs bir kere derlenmiş şablon (render_page)
+#
+#   python bench/template_bench.py [tekrar]
+#
+import shutil
+import sys
+import time
+
+from flask import render_template_string
+
+from common import load_app, make_workspace
+
+CONTENT = "<div class='card'><div class='cardBody'>örnek içerik</div></div>" * 20
+WEATHER = {"ok": False, "temp": None, "icon": "☁️", "label": "Hava"}
+
+
+A = None
+
+
+def old_path():
+    return render_template_string(
+        A.BASE,
+        title="Bench",
+        content=CONTENT,
+        path="/",
+        admin=False,
+        socials=A.SOCIALS,
+        show_weather=False,
+        weather=WEATHER,
+        bg_url=A.versioned_url("/static/arkaplan.jpg", (A.file_version(A.BG_FILE) or (0,))[0]),
+    )
+
+
+def new_path():
+    return A.render_page("Bench", CONTENT, show_weather=False)
+
+
+def run(fn, n):
+    fn()  # ısınma
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1000.0
+
+
+def main():
+    global A
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    work = make_workspace()
+    try:
+        A = load_app(work)
+        with A.app.test_request_context("/"):
+            assert old_path() == new_path()
+            old_ms = run(old_path, n)
+            new_ms = run(new_path, n)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    print(f"render_template_string (her istekte derle): {old_ms:.3f} ms/istek")
+    print(f"render_page (bir kere derlenmiş):          {new_ms:.3f} ms/istek")
+    print(f"hızlanma: x{old_ms / new_ms:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# gunicorn ayarları
+#
+#   gunicorn app:app              (bu klasörde çalıştırınca dosya kendiliğinden okunur)
+#   python app.py --uretim        (aynı ayarlarla, app.py içinden)
+#
+# Her ayar ortam değişkeniyle ezilebilir (DUZAGAC_*). Linux/macOS içindir; Windows'ta
+# gunicorn çalışmaz, orada app.py geliştirme sunucusuyla açılır.
+import multiprocessing
+import os
+
+CPUS = multiprocessing.cpu_count()
+
+bind = os.environ.get("DUZAGAC_BIND", f"0.0.0.0:{os.environ.get('PORT', '5050')}")
+
+# gthread: her worker'da birkaç thread. Yavaş mobil bağlantılar (büyük sayfa, video)
+# bir thread'i bekletir, worker'ın tamamını değil. SQLite okumaları ve dosya G/Ç'si
+# GIL'i bırakır. gevent kuruluysa DUZAGAC_WORKER_CLASS=gevent ile seçilebilir.
+worker_class = os.environ.get("DUZAGAC_WORKER_CLASS", "gthread")
+if worker_class == "gevent":
+    try:
+        import gevent  # noqa: F401
+    except ImportError:
+        print("gevent kurulu değil; gthread kullanılıyor.")
+        worker_class = "gthread"
+
+# Worker başına ayrı sayfa önbelleği ve medya listesi tutulur; SQLite'ta tek yazar var.
+# Bu yüzden çekirdek+1 (en az 2, en fazla 8) worker, her birinde 4 thread yeterli.
+workers = int(os.environ.get("DUZAGAC_WORKERS", max(2, min(CPUS + 1, 8))))
+# Video akışları (app.py MEDIA_MAX_STREAMS) varsayılan olarak threads - 1 ile sınırlı:
+# 4 thread'de en fazla 3 video, kalan thread sayfa/beğeni/yorum içindir. Bu yüzden en az 2.
+threads = max(2, int(os.environ.get("DUZAGAC_THREADS", 4)))
+worker_connections = int(os.environ.get("DUZAGAC_WORKER_CONNECTIONS", 200))   # sadece gevent
+
+# Uygulama ana süreçte bir kere yüklenir: klasör/dosya hazırlığı ve DB şema
+# adımları tek sefer çalışır, worker'lar fork ile hazır gelir. Açık SQLite
+# bağlantısı ve arka plan thread'leri fork'a taşınmaz (app.py pid kontrol eder).
+# gevent'te monkey patch worker içinde yapıldığından app orada yüklenmeli.
+preload_app = worker_class != "gevent"
+
+# Worker'lar belli sayıda istekten sonra sırayla yenilenir (bellek birikmesine karşı);
+# jitter hepsinin aynı anda yenilenmesini önler. Yenilenen worker işini bitirip çıkar.
+max_requests = int(os.environ.get("DUZAGAC_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+graceful_timeout = 30
+timeout = 60
+
+# Tarayıcı aynı bağlantıyla sayfa + küçük resimler + API çağrılarını yapar.
+# Önde nginx varsa bu süre nginx'in upstream keepalive süresinden uzun olmalı.
+keepalive = int(os.environ.get("DUZAGAC_KEEPALIVE", 5))
+
+# Video akışı gunicorn'un sendfile desteğini kullanır (app.py /medya/video)
+sendfile = True
+
+accesslog = os.environ.get("DUZAGAC_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.environ.get("DUZAGAC_LOG_LEVEL", "info")
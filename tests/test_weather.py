@@ -0,0 +1,142 @@
+# WeatherRefresher: yerel sahte Open-Meteo sunucusuna karşı
+#
+# app.py import edilirken yanındaki data.db/static'i hazırlar; bu yüzden geçici
+# bir klasöre kopyalanıp oradan yüklenir (bench/common.py ile aynı yöntem).
+import http.server
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def A(tmp_path_factory):
+    work = tmp_path_factory.mktemp("duzagac")
+    shutil.copy2(os.path.join(REPO_DIR, "app.py"), work / "app.py")
+    spec = importlib.util.spec_from_file_location("duzagac_app_test", work / "app.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    yield module
+    module.write_queue.close()
+    sys.modules.pop(spec.name, None)
+
+
+class Stub:
+    # sahte hava durumu servisi: istek sayar, isteğe göre gecikir ya da 500 döner
+    def __init__(self):
+        self.hits = 0
+        self.delay = 0.0
+        self.fail = False
+        self.temp = 21.5
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                time.sleep(stub.delay)
+                if stub.fail:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                body = json.dumps({"current_weather": {
+                    "temperature": stub.temp, "weathercode": 0, "windspeed": 5,
+                }}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    s = Stub()
+    yield s
+    s.close()
+
+
+def wait_idle(w, timeout=5.0):
+    deadline = time.time() + timeout
+    while w._refreshing and time.time() < deadline:
+        time.sleep(0.01)
+    assert not w._refreshing
+
+
+def test_concurrent_get_hits_upstream_once(A, stub):
+    stub.delay = 0.3
+    w = A.WeatherRefresher(stub.url, ttl=600, timeout=2)
+    start = threading.Barrier(20)
+    seen = []
+
+    def reader():
+        start.wait()
+        seen.append(w.get())
+
+    ts = [threading.Thread(target=reader) for _ in range(20)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+
+    # istekler ağı beklemez: hepsi yer tutucuyu alır, yenileme tek sefer yapılır
+    assert all(d is A.WeatherRefresher.PLACEHOLDER for d in seen)
+    wait_idle(w)
+    assert stub.hits == 1
+    assert w.get()["temp"] == 21.5
+    assert w.version == 1
+
+
+def test_stale_data_served_when_upstream_fails(A, stub):
+    w = A.WeatherRefresher(stub.url, ttl=600, timeout=2)
+    w.refresh()
+    fresh = w.get()
+    assert fresh["ok"] and fresh["temp"] == 21.5
+
+    stub.fail = True
+    w.ttl = 0   # veri artık eski: sıradaki get() yenilemeyi tetikler
+    assert w.get() == fresh
+    wait_idle(w)
+    assert stub.hits == 2
+    assert w.get() == fresh
+    assert w._failures == 1
+    assert w.version == 1
+
+
+def test_backoff_grows_and_is_capped(A, stub):
+    stub.fail = True
+    w = A.WeatherRefresher(stub.url, ttl=600, timeout=2)
+    delays = []
+    for _ in range(8):
+        w.refresh()
+        delays.append(w._next_try - time.time())
+
+    expected = [min(A.WEATHER_RETRY_MIN * 2 ** i, A.WEATHER_RETRY_MAX) for i in range(8)]
+    assert [round(d) for d in delays] == expected
+    assert w.get() is A.WeatherRefresher.PLACEHOLDER
+
+    # bekleme süresi dolmadan get() upstream'e gitmez
+    hits = stub.hits
+    for _ in range(5):
+        w.get()
+    time.sleep(0.1)
+    assert stub.hits == hits
+    assert not w._refreshing